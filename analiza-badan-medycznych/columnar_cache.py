@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# copyright: marekkoc
+# Created: 2026-10-18
+# Updated: 2026-10-18
+
+"""Kolumnowy cache sparsowanych plików z danymi (Feather / Arrow IPC).
+
+Wspólny dla aplikacji Dash (dash/data_loader.py) i analizatora Qt
+(qt/main-medical_analyzer.py). Kluczem jest skrót zawartości pliku
+źródłowego i rodzaj parsera - ten sam plik wczytany drugi raz (także po
+restarcie, także z drugiej aplikacji) nie jest parsowany, tylko czytany
+z pliku .arrow z typowanymi kolumnami (daty jako datetime64, liczby jako
+float/int). Pliki zapisywane są bez kompresji, więc czytane są przez
+mapowanie pamięci.
+
+Katalog cache: .cache/columnar obok tego modułu albo MEDICAL_CACHE_DIR.
+Bez pyarrow (albo przy błędzie zapisu/odczytu) dane są po prostu parsowane.
+"""
+
+import glob
+import hashlib
+import os
+import re
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+CACHE_DIR = os.environ.get(
+    "MEDICAL_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "columnar"))
+# Zmiana formatu wyników parserów unieważnia wszystkie wpisy
+CACHE_FORMAT = 1
+CHUNK_SIZE = 1 << 20
+UNSAFE_CHARS = re.compile(r"[^\w.-]+")
+
+
+def file_hash(file_name):
+    """Skrót zawartości pliku (blake2b, 32 znaki hex)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_prefix(file_name, kind):
+    """Początek nazwy wpisu: rodzaj parsera, nazwa i skrót ścieżki pliku źródłowego."""
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    source = hashlib.blake2b(os.path.abspath(file_name).encode("utf-8"), digest_size=4).hexdigest()
+    return UNSAFE_CHARS.sub("_", f"{kind}-v{CACHE_FORMAT}-{stem}-{source}")
+
+
+def entry_path(file_name, kind, digest, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, f"{entry_prefix(file_name, kind)}-{digest}.arrow")
+
+
+def read_entry(path):
+    """DataFrame z pliku .arrow (mapowanie pamięci) albo None."""
+    if feather is None or not os.path.exists(path):
+        return None
+    try:
+        return feather.read_table(path, memory_map=True).to_pandas()
+    except Exception as e:
+        print(f"Błąd odczytu cache {path}: {e}")
+        return None
+
+
+def write_entry(path, df):
+    """Zapisuje DataFrame do .arrow (bez kompresji) i usuwa starsze wersje tego pliku."""
+    if feather is None:
+        return
+    prefix = os.path.basename(path).rsplit("-", 1)[0]
+    old_entry = re.compile(re.escape(prefix) + r"-[0-9a-f]{32}\.arrow$")
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Błąd zapisu cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    for old_path in glob.glob(os.path.join(os.path.dirname(path), glob.escape(prefix) + "-*.arrow")):
+        if old_path != path and old_entry.match(os.path.basename(old_path)):
+            os.remove(old_path)
+
+
+def cached_read(file_name, kind, parser, cache_dir=None):
+    """Wynik parser(file_name) z cache albo sparsowany i zapisany do cache.
+
+    kind to nazwa parsera (np. "medication") - ten sam plik może być
+    czytany przez różne parsery. Indeks DataFrame nie jest zapisywany.
+    """
+    path = entry_path(file_name, kind, file_hash(file_name), cache_dir)
+    df = read_entry(path)
+    if df is None:
+        df = parser(file_name)
+        write_entry(path, df)
+    return df
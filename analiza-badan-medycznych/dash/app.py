@@ -1,19 +1,28 @@
 #!/usr/bin/env python3
 # copyright: marekkoc
 # Created: 2025-05-11
-# Updated: 2025-05-11
+# Updated: 2026-10-18
 
 import dash
-from dash import dcc, html
+from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
 
 # Importuj moduły aplikacji
-from data_loader import load_medication_data, create_blood_test_data
+from data_loader import load_medication_data, LabResultsLoader
+from data_store import registry
 from tabs import medication, blood_test, data_tabs
 
 # Wczytaj dane
 medication_df = load_medication_data()
-blood_df = create_blood_test_data(medication_df)
+lab_loader = LabResultsLoader()
+lab_loader.refresh()
+
+# Dane zostają na serwerze - do przeglądarki trafia tylko {"id", "version"}
+medication_ref = registry.put("medication", medication_df)
+blood_ref = registry.put("labs", lab_loader.table())
+
+# Co ile sprawdzać zmiany plików CSV z wynikami badań [ms]
+LAB_REFRESH_INTERVAL = 30 * 1000
 
 # Inicjalizuj aplikację
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
@@ -33,11 +42,28 @@ app.layout = dbc.Container([
         dbc.Tab(label="Dane", children=data_tabs.get_layout())
     ]),
     
-    # Ukryte przechowywanie danych
-    dcc.Store(id="medication-data", data=medication_df.to_dict('records')),
-    dcc.Store(id="blood-data", data=blood_df.to_dict('records'))
+    # Ukryte referencje do danych w rejestrze serwera (data_store.registry)
+    dcc.Store(id="medication-data", data=medication_ref),
+    dcc.Store(id="blood-data", data=blood_ref),
+    dcc.Interval(id="lab-refresh", interval=LAB_REFRESH_INTERVAL)
 ], fluid=True)
 
+@app.callback(
+    Output("blood-data", "data"),
+    Input("lab-refresh", "n_intervals"),
+    State("blood-data", "data"),
+    prevent_initial_call=True
+)
+def refresh_lab_data(n_intervals, blood_data):
+    """Wczytuje zmienione pliki CSV; sesja ze starszą wersją zbioru dostaje najnowszą"""
+    if lab_loader.refresh():
+        registry.put("labs", lab_loader.table())
+    # Zmianę plików wykrywa jedna sesja - pozostałe porównują swoją referencję z rejestrem
+    latest = registry.ref("labs")
+    if blood_data != latest:
+        return latest
+    return dash.no_update
+
 # Zarejestruj callbacki z modułów
 medication.register_callbacks(app)
 blood_test.register_callbacks(app)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# copyright: marekkoc
+# Created: 2026-10-18
+# Updated: 2026-10-18
+
+"""Benchmark budowy wykresu badań krwi dla 10, 100 i 1000 dawek leku.
+
+Porównuje dawną wersję (add_shape/add_annotation dla każdej dawki)
+z build_blood_figure (wszystkie dawki jako dwa ślady: linie z przerwami
+None i podpisy). Podawana jest mediana z kilku powtórzeń, dla dawnej
+wersji przy 1000 dawek jeden pomiar - trwa on kilka minut (czas rośnie
+kwadratowo z liczbą dawek). Uruchomienie (opcjonalnie z liczbami dawek):
+
+    python benchmarks/bench_dose_markers.py [10 100 1000]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tabs.blood_test import build_blood_figure
+
+DOSES = (10, 100, 1000)
+REPEATS = 5
+
+
+def make_data(doses):
+    """Dawki co 28 dni i wyniki trzech badań dzień przed i tydzień po każdej dawce"""
+    med_df = pd.DataFrame({
+        'Date': pd.date_range('2000-01-01', periods=doses, freq='28D'),
+        'Dose_nr': np.arange(1, doses + 1),
+        'City': 'Bergen'
+    })
+    dates = np.sort(np.concatenate([med_df['Date'] - pd.Timedelta(days=1),
+                                    med_df['Date'] + pd.Timedelta(days=7)]))
+    rng = np.random.default_rng(42)
+    # Wyniki w formacie długim (jak z LabResultsLoader)
+    blood_df = pd.concat([
+        pd.DataFrame({'date': dates, 'lab': 'lab', 'test': test,
+                      'value': mean + rng.normal(0, sd, len(dates)),
+                      'unit': '', 'ref_min': np.nan, 'ref_max': np.nan})
+        for test, mean, sd in (('Hemoglobina', 14.0, 0.5), ('Leukocyty', 7.0, 0.8),
+                               ('Płytki krwi', 250, 20))
+    ], ignore_index=True)
+    return blood_df, med_df
+
+
+def build_per_dose(blood_df, med_df):
+    """Dawna wersja update_blood_graph - kształt i podpis dodawane osobno dla każdej dawki"""
+    fig = go.Figure()
+    for test, group in blood_df.groupby('test'):
+        fig.add_trace(go.Scatter(x=group['date'], y=group['value'], mode='lines+markers', name=test))
+    for _, row in med_df.iterrows():
+        fig.add_shape(type="line", x0=row['Date'], x1=row['Date'], y0=0, y1=1, yref="paper",
+                      line=dict(color="gray", dash="dash", width=1))
+        fig.add_annotation(x=row['Date'], y=1, yref="paper", text=f"Dawka #{int(row['Dose_nr'])}",
+                           showarrow=False, textangle=0, xanchor="left")
+    fig.update_layout(title="Wyniki badań krwi", xaxis_title="Data", yaxis_title="Wartość",
+                      legend_title="Parametry", plot_bgcolor='white')
+    return fig
+
+
+def measure(build, blood_df, med_df, repeats):
+    """Mediana czasu [s] budowy wykresu i ostatni zbudowany wykres"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fig = build(blood_df, med_df)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), fig
+
+
+def same_markers(old, new):
+    """Czy oba wykresy zaznaczają te same dawki (daty linii i podpisy)"""
+    lines, texts = new.data[-2], new.data[-1]
+    old_dates = [pd.Timestamp(shape.x0) for shape in old.layout.shapes]
+    return (old_dates == [pd.Timestamp(x) for x in lines.x[0::3]]
+            and [a.text for a in old.layout.annotations] == list(texts.text))
+
+
+if __name__ == '__main__':
+    doses_list = [int(arg) for arg in sys.argv[1:]] or DOSES
+    print(f"{'dawki':>6} {'po jednej [ms]':>15} {'naraz [ms]':>11} {'przyspieszenie':>15}")
+    for doses in doses_list:
+        blood_df, med_df = make_data(doses)
+        # Dawna wersja dla 1000 dawek trwa minuty - jeden pomiar
+        repeats = 1 if doses >= 1000 else REPEATS
+        per_dose, old = measure(build_per_dose, blood_df, med_df, repeats)
+        batched, new = measure(build_blood_figure, blood_df, med_df, REPEATS)
+        # Obie wersje zaznaczają te same dawki
+        assert same_markers(old, new)
+        print(f"{doses:>6} {per_dose * 1000:>15.1f} {batched * 1000:>11.1f} {per_dose / batched:>14.1f}x")
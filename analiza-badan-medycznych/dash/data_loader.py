@@ -1,39 +1,190 @@
 #!/usr/bin/env python3
 # copyright: marekkoc
 # Created: 2025-05-11
-# Updated: 2025-05-11
+# Updated: 2026-10-18
+
+import glob
+import os
+import re
+import sys
+import threading
 
 import pandas as pd
 import numpy as np
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# columnar_cache.py jest wspólny z analizatorem Qt (katalog wyżej)
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from columnar_cache import cached_read
+
+# Pliki CSV z wynikami badań (wzorce glob względem katalogu aplikacji)
+LAB_SOURCES = [
+    os.path.join(BASE_DIR, '..', 'pdf-converter-qt', 'csv', '*.csv'),
+    os.path.join(BASE_DIR, '..', 'qt', 'wyniki_badan.csv'),
+]
+LAB_COLUMNS = ['date', 'lab', 'test', 'value', 'unit', 'ref_min', 'ref_max']
+
+NUMBER = r'\d+(?:[.,]\d+)?'
+VALUE = re.compile(rf'({NUMBER})(?:\s*\*\s*10\s*\*\*\s*(-?\d+))?')
+RANGE = re.compile(rf'^({NUMBER})\s*[-–—]\s*({NUMBER})')
+UPPER = re.compile(rf'^<=?\s*({NUMBER})')
+LOWER = re.compile(rf'^>=?\s*({NUMBER})')
+
+def parse_medication(file_name):
+    """Parsuje plik tekstowy z dawkami leku (data, numer dawki, miasto)"""
+    df = pd.read_csv(file_name, sep='\s+', 
+                     skiprows=1,
+                     names=['Date', 'Dose_nr', 'City'])
+    df['Date'] = pd.to_datetime(df['Date'], format='%Y.%m.%d')
+    return df
+
 def load_medication_data():
-    """Wczytaj dane o leku z pliku medicine.txt"""
+    """Wczytaj dane o leku z pliku medicine.txt (z cache kolumnowego, jeśli plik się nie zmienił)"""
     try:
-        df = pd.read_csv('medicine.txt', sep='\s+', 
-                         skiprows=1,
-                         names=['Date', 'Dose_nr', 'City'])
-        df['Date'] = pd.to_datetime(df['Date'], format='%Y.%m.%d')
-        return df
+        return cached_read('medicine.txt', 'medication', parse_medication)
     except Exception as e:
         print(f"Błąd wczytywania danych: {e}")
         return pd.DataFrame(columns=['Date', 'Dose_nr', 'City'])
 
-def create_blood_test_data(med_df):
-    """Utwórz syntetyczne dane badań krwi na podstawie dat poboru leku"""
-    if med_df.empty:
-        return pd.DataFrame()
-    
-    dates = []
-    for date in med_df['Date']:
-        dates.append(date - pd.Timedelta(days=1))
-        dates.append(date + pd.Timedelta(days=7))
-    dates = sorted(list(set(dates)))
-    
-    np.random.seed(42)
-    blood_df = pd.DataFrame({
-        'Date': dates,
-        'Hemoglobin': [14.0 + np.random.normal(0, 0.5) for _ in range(len(dates))],
-        'WBC': [7.0 + np.random.normal(0, 0.8) for _ in range(len(dates))],
-        'Platelets': [250 + np.random.normal(0, 20) for _ in range(len(dates))]
+def to_number(text):
+    return float(text.replace(',', '.'))
+
+def parse_result(text):
+    """Wynik z PDF-a jako (wartość, wykładnik): '↑ 228' -> (228, 0), '5.40*10**3' -> (5.4, 3)
+
+    Znaczniki ↑/↓ i znak < lub > (wynik poniżej/powyżej progu) są pomijane.
+    """
+    match = VALUE.search(str(text))
+    if not match:
+        return np.nan, 0
+    return to_number(match.group(1)), int(match.group(2) or 0)
+
+def parse_reference(text):
+    """Zakres referencyjny jako (min, max): '13.4 - 17.0', '< 0.5', '>=40', '< 145/130/100'"""
+    text = str(text).strip()
+    for pattern, bounds in ((RANGE, lambda m: (to_number(m.group(1)), to_number(m.group(2)))),
+                            (UPPER, lambda m: (np.nan, to_number(m.group(1)))),
+                            (LOWER, lambda m: (to_number(m.group(1)), np.nan))):
+        match = pattern.match(text)
+        if match:
+            return bounds(match)
+    return np.nan, np.nan
+
+def scaled_unit(unit, exponent):
+    """Jednostka z wykładnikiem wyniku, żeby wartość i zakres były w tej samej skali"""
+    if not exponent:
+        return unit
+    if unit.startswith('1/'):
+        return f"10^{exponent}{unit[1:]}"
+    return f"10^{exponent} {unit}".strip()
+
+def parse_report_csv(file_name):
+    """CSV z pdf-converter-qt (wiersz = badanie: Tests, Result, Reference Range, Units, Date, Place)"""
+    raw = pd.read_csv(file_name, dtype=str, keep_default_na=False)
+    results = raw['Result'].map(parse_result)
+    reference = raw['Reference Range'].map(parse_reference)
+    exponents = [exponent for _, exponent in results]
+    place = raw['Place'].str.strip() if 'Place' in raw else pd.Series('', index=raw.index)
+    return pd.DataFrame({
+        'date': pd.to_datetime(raw['Date'].str.strip(), format='%Y.%m.%d'),
+        'lab': place.where(place != '', os.path.splitext(os.path.basename(file_name))[0]),
+        'test': raw['Tests'].str.strip(),
+        'value': [value for value, _ in results],
+        'unit': [scaled_unit(unit.strip(), exponent)
+                 for unit, exponent in zip(raw.get('Units', pd.Series('', index=raw.index)), exponents)],
+        'ref_min': [low for low, _ in reference],
+        'ref_max': [high for _, high in reference],
     })
-    return blood_df
+
+def parse_wide_csv(file_name):
+    """CSV analizatora z katalogu qt (wiersz = data: Data, <badanie>, <badanie>_norma_min/_norma_max)"""
+    raw = pd.read_csv(file_name)
+    tests = [col for col in raw.columns
+             if col != 'Data' and not col.endswith(('_norma_min', '_norma_max'))]
+    frames = []
+    for test in tests:
+        frames.append(pd.DataFrame({
+            'date': pd.to_datetime(raw['Data']),
+            'test': test,
+            'value': pd.to_numeric(raw[test], errors='coerce'),
+            'ref_min': pd.to_numeric(raw.get(f"{test}_norma_min", np.nan), errors='coerce'),
+            'ref_max': pd.to_numeric(raw.get(f"{test}_norma_max", np.nan), errors='coerce'),
+        }))
+    long = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=LAB_COLUMNS)
+    long['lab'] = os.path.splitext(os.path.basename(file_name))[0]
+    long['unit'] = ''
+    return long[LAB_COLUMNS]
+
+def parse_lab_csv(file_name):
+    """Wyniki z pliku CSV w formacie długim (kolumny LAB_COLUMNS), format rozpoznawany po nagłówku"""
+    header = pd.read_csv(file_name, nrows=0).columns
+    if 'Tests' in header and 'Result' in header:
+        long = parse_report_csv(file_name)
+    elif 'Data' in header:
+        long = parse_wide_csv(file_name)
+    else:
+        raise ValueError(f"Nieznany format pliku {file_name}")
+    return long.dropna(subset=['value'])[LAB_COLUMNS]
+
+def empty_lab_table():
+    return pd.DataFrame({
+        'date': pd.Series(dtype='datetime64[ns]'),
+        'lab': pd.Series(dtype=str), 'test': pd.Series(dtype=str),
+        'value': pd.Series(dtype=float), 'unit': pd.Series(dtype=str),
+        'ref_min': pd.Series(dtype=float), 'ref_max': pd.Series(dtype=float),
+    })
+
+class LabResultsLoader:
+    """Przyrostowe wczytywanie wyników badań z plików CSV
+
+    Dla każdego pliku pamiętany jest (mtime, rozmiar) i sparsowana tabela -
+    refresh() parsuje ponownie tylko pliki nowe lub zmienione, a wspólna
+    tabela (format długi, kolumny LAB_COLUMNS) jest składana od nowa tylko
+    wtedy, gdy coś się zmieniło.
+    """
+
+    def __init__(self, sources=LAB_SOURCES):
+        self.sources = sources
+        self.files = {}     # ścieżka -> ((mtime_ns, rozmiar), DataFrame)
+        self.results = empty_lab_table()
+        self.lock = threading.Lock()
+
+    def source_files(self):
+        paths = set()
+        for pattern in self.sources:
+            paths.update(os.path.normpath(path) for path in glob.glob(pattern))
+        return sorted(paths)
+
+    def refresh(self):
+        """Wczytuje zmienione pliki; zwraca True, jeśli tabela wyników się zmieniła"""
+        with self.lock:
+            changed = False
+            current = {}
+            for path in self.source_files():
+                stat = os.stat(path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                cached = self.files.get(path)
+                if cached is not None and cached[0] == stamp:
+                    current[path] = cached
+                    continue
+                try:
+                    # Plik o tej samej zawartości czytany z cache kolumnowego bez parsowania
+                    frame = cached_read(path, 'lab-results', parse_lab_csv)
+                except Exception as e:
+                    # Błędny plik nie jest wczytywany ponownie, dopóki się nie zmieni
+                    print(f"Błąd wczytywania wyników z {path}: {e}")
+                    frame = empty_lab_table()
+                current[path] = (stamp, frame)
+                changed = True
+            changed = changed or set(current) != set(self.files)
+            self.files = current
+            if changed:
+                frames = [frame for _, frame in current.values() if len(frame)]
+                results = pd.concat(frames, ignore_index=True) if frames else empty_lab_table()
+                self.results = results.sort_values(['date', 'lab', 'test'], ignore_index=True)
+            return changed
+
+    def table(self):
+        """Aktualna tabela wyników (współdzielona - tylko do odczytu)"""
+        with self.lock:
+            return self.results
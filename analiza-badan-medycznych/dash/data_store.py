@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# copyright: marekkoc
+# Created: 2026-10-18
+# Updated: 2026-10-18
+
+"""Rejestr zbiorów danych po stronie serwera.
+
+DataFrame'y trzymane są w pamięci serwera pod identyfikatorem zbioru
+i jego wersją, a do przeglądarki (dcc.Store) trafia tylko mała referencja
+{"id": ..., "version": ...}. Callbacki pobierają DataFrame z rejestru
+zamiast odtwarzać go z JSON-a przesłanego przez przeglądarkę.
+
+Wersja to skrót zawartości zbioru - te same dane mają tę samą wersję
+w każdym procesie serwera i po każdym restarcie.
+
+Wyniki callbacków (wykresy, tabele) zapamiętywane są we wspólnym
+cache LRU (dekorator memoize) pod kluczem: funkcja, wersje zbiorów
+i pozostałe argumenty - przełączanie zakładek i kolejne sesje
+przeglądarki dostają gotowy wynik, dopóki dane się nie zmienią.
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class DatasetRegistry:
+    """Zbiory danych kluczowane (id, wersja): id -> {wersja: DataFrame}.
+
+    Dla każdego id trzymanych jest kilka ostatnich wersji (keep_versions),
+    więc sesja przeglądarki ze starszą referencją dostaje dokładnie tę
+    wersję, którą wskazuje, dopóki nie przejdzie na nową.
+    """
+
+    # Ile wersji jednego zbioru trzymać w pamięci (najnowsze)
+    keep_versions = 3
+
+    def __init__(self):
+        self.datasets = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def content_version(df):
+        """Skrót zawartości DataFrame (kolumny, typy i wartości)."""
+        values = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        header = pd.util.hash_array(pd.Index(df.columns.astype(str)).to_numpy())
+        dtypes = pd.util.hash_array(df.dtypes.astype(str).to_numpy(dtype=object))
+        digest = hashlib.blake2b(digest_size=8)
+        for part in (values, header, dtypes):
+            digest.update(part.tobytes())
+        return f"{len(df)}-{digest.hexdigest()}"
+
+    def put(self, dataset_id, df):
+        """Zapisuje nową wersję zbioru i zwraca referencję do dcc.Store."""
+        version = self.content_version(df)
+        with self.lock:
+            versions = self.datasets.setdefault(dataset_id, OrderedDict())
+            versions[version] = df
+            versions.move_to_end(version)
+            while len(versions) > self.keep_versions:
+                versions.popitem(last=False)
+        return {"id": dataset_id, "version": version}
+
+    def version(self, dataset_id):
+        """Najnowsza wersja zbioru (None, jeśli go nie ma)."""
+        with self.lock:
+            versions = self.datasets.get(dataset_id)
+            return next(reversed(versions)) if versions else None
+
+    def ref(self, dataset_id):
+        version = self.version(dataset_id)
+        if version is None:
+            raise KeyError(dataset_id)
+        return {"id": dataset_id, "version": version}
+
+    def resolve(self, ref):
+        """(wersja, DataFrame) dla referencji z dcc.Store (lub samego id zbioru).
+
+        Referencja z wersją trzymaną w rejestrze dostaje dokładnie tę wersję;
+        samo id albo wersja już usunięta z rejestru - najnowszą. Zwracana
+        wersja to ta, której dane faktycznie zwrócono (klucz dla memoize).
+        Brak zbioru - (None, pusty DataFrame).
+        """
+        dataset_id, version = (ref["id"], ref.get("version")) if isinstance(ref, dict) else (ref, None)
+        with self.lock:
+            versions = self.datasets.get(dataset_id)
+            if not versions:
+                return None, pd.DataFrame()
+            if version not in versions:
+                version = next(reversed(versions))
+            return version, versions[version]
+
+    def get(self, ref):
+        """DataFrame dla referencji (zob. resolve).
+
+        Zwracany DataFrame jest współdzielony - callbacki nie mogą go modyfikować.
+        """
+        return self.resolve(ref)[1]
+
+
+class ResultCache:
+    """Cache LRU wyników callbacków, wspólny dla wszystkich zakładek i sesji."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """(True, wynik) jeśli klucz jest w cache, inaczej (False, None)."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+def cache_key(value, datasets):
+    """Argument callbacku jako hashowalny klucz; referencja zbioru -> (id, wersja zwracana przez rejestr)."""
+    if isinstance(value, dict):
+        if set(value) == {"id", "version"}:
+            # Wersja, którą rejestr faktycznie zwróci dla tej referencji (usunięta -> najnowsza)
+            return ("dataset", value["id"], datasets.resolve(value)[0])
+        return tuple(sorted((k, cache_key(v, datasets)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(cache_key(v, datasets) for v in value)
+    return value
+
+
+# Wspólny rejestr aplikacji (app.py zapisuje, zakładki czytają)
+registry = DatasetRegistry()
+results = ResultCache()
+
+
+def memoize(func):
+    """Zapamiętuje wynik callbacku we wspólnym cache (dekorator pod @app.callback).
+
+    Zapamiętany wynik jest współdzielony - callbacki nie mogą go później modyfikować.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        key = (name, cache_key(args, registry))
+        found, value = results.get(key)
+        if found:
+            return value
+        value = func(*args)
+        results.put(key, value)
+        return value
+
+    return wrapper
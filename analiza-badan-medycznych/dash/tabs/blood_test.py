@@ -1,117 +1,171 @@
 #!/usr/bin/env python3
 # copyright: marekkoc
 # Created: 2025-05-11
-# Updated: 2025-05-11
+# Updated: 2026-10-18
 
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+
+from data_store import registry, memoize
+
+# Ile badań (najczęściej wykonywanych) pokazać na wykresie na start
+DEFAULT_TESTS = 3
 
 def get_layout():
     """Zwraca layout zakładki z badaniami krwi"""
     return html.Div([
+        dcc.Dropdown(id="blood-tests", multi=True, placeholder="Wybierz badania"),
         dcc.Graph(id="blood-graph"),
         html.Div(id="blood-stats")
     ])
 
+def test_label(test, unit):
+    return f"{test} [{unit}]" if unit else test
+
+def reference_label(ref_min, ref_max):
+    """Zakres referencyjny jako tekst: '13.4 - 17', '< 41', '> 40' albo pusty"""
+    if pd.isna(ref_min) and pd.isna(ref_max):
+        return ""
+    if pd.isna(ref_min):
+        return f"< {ref_max:g}"
+    if pd.isna(ref_max):
+        return f"> {ref_min:g}"
+    return f"{ref_min:g} - {ref_max:g}"
+
+def dose_markers(med_df):
+    """Dawki leku jako dwa ślady: pionowe linie (przerwy None) i podpisy.
+    
+    Ślady leżą na ukrytej osi yaxis2 o zakresie 0-1 - linie sięgają od dołu
+    do góry wykresu jak kształty z yref="paper", niezależnie od wartości badań.
+    """
+    dates = med_df['Date'].to_numpy()
+    labels = ("Dawka #" + med_df['Dose_nr'].astype(int).astype(str)).to_numpy()
+    count = len(dates)
+    # Każda linia to (data, 0), (data, 1), przerwa
+    line_x = np.empty(count * 3, dtype=object)
+    line_x[0::3] = dates
+    line_x[1::3] = dates
+    line_x[2::3] = None
+    line_y = np.tile(np.array([0, 1, None], dtype=object), count)
+    lines = go.Scatter(x=line_x, y=line_y, yaxis="y2", mode="lines", showlegend=False,
+                       hoverinfo="skip", line=dict(color="gray", dash="dash", width=1))
+    texts = go.Scatter(x=dates, y=np.ones(count), yaxis="y2", mode="text", text=labels,
+                       textposition="bottom right", showlegend=False,
+                       hovertemplate="%{x|%Y-%m-%d}<br>%{text}<extra></extra>")
+    return [lines, texts]
+
+def build_blood_figure(lab_df, med_df, tests=None):
+    """Wykres wyników badań (tabela w formacie długim) z zaznaczonymi dawkami leku"""
+    if tests:
+        lab_df = lab_df[lab_df['test'].isin(tests)]
+    if lab_df.empty:
+        return go.Figure()
+    
+    # Linia dla każdego badania (i jednostki - laboratoria podają różne skale)
+    traces = [
+        go.Scatter(x=group['date'], y=group['value'], mode='lines+markers',
+                   name=test_label(test, unit), text=group['lab'],
+                   customdata=group[['ref_min', 'ref_max']].to_numpy(),
+                   hovertemplate='%{x|%Y-%m-%d}: %{y} (%{text})<br>'
+                                 'Norma: %{customdata[0]} - %{customdata[1]}')
+        for (test, unit), group in lab_df.groupby(['test', 'unit'], sort=True)
+    ]
+    
+    # Pionowe linie dla dawek leku - dwa ślady dla wszystkich dawek zamiast
+    # add_shape/add_annotation na dawkę (każde wywołanie kopiuje i waliduje layout)
+    if not med_df.empty:
+        traces += dose_markers(med_df)
+    fig = go.Figure(traces)
+    
+    fig.update_layout(
+        title="Wyniki badań krwi",
+        xaxis_title="Data",
+        yaxis_title="Wartość",
+        yaxis2=dict(overlaying="y", range=[0, 1], visible=False, fixedrange=True),
+        legend_title="Parametry",
+        plot_bgcolor='white'
+    )
+    
+    return fig
+
 def register_callbacks(app):
     """Rejestruje callbacki związane z zakładką badań krwi"""
     
+    @app.callback(
+        [Output("blood-tests", "options"),
+         Output("blood-tests", "value")],
+        Input("blood-data", "data"),
+        State("blood-tests", "value")
+    )
+    def update_test_options(data, selected):
+        df = registry.get(data)
+        if df.empty:
+            return [], []
+        counts = df['test'].value_counts()
+        options = sorted(counts.index)
+        # Wybór użytkownika zostaje po odświeżeniu danych (bez badań, których już nie ma)
+        selected = [test for test in selected or [] if test in counts.index]
+        return options, selected or list(counts.index[:DEFAULT_TESTS])
+
     @app.callback(
         Output("blood-graph", "figure"),
         [Input("blood-data", "data"),
-         Input("medication-data", "data")]
+         Input("medication-data", "data"),
+         Input("blood-tests", "value")]
     )
-    def update_blood_graph(blood_data, med_data):
-        blood_df = pd.DataFrame(blood_data)
-        med_df = pd.DataFrame(med_data)
-        
-        if blood_df.empty:
-            return go.Figure()
-        
-        blood_df['Date'] = pd.to_datetime(blood_df['Date'])
-        
-        fig = go.Figure()
-        
-        # Dodaj linie dla parametrów krwi
-        for col in blood_df.columns:
-            if col != 'Date':
-                fig.add_trace(go.Scatter(
-                    x=blood_df['Date'],
-                    y=blood_df[col],
-                    mode='lines+markers',
-                    name=col
-                ))
-        
-        # Dodaj pionowe linie dla dawek leku
-        if not med_df.empty:
-            med_df['Date'] = pd.to_datetime(med_df['Date'])
-            
-            for _, row in med_df.iterrows():
-                fig.add_shape(
-                    type="line",
-                    x0=row['Date'],
-                    x1=row['Date'],
-                    y0=0,
-                    y1=1,
-                    yref="paper",
-                    line=dict(color="gray", dash="dash", width=1)
-                )
-                
-                fig.add_annotation(
-                    x=row['Date'],
-                    y=1,
-                    yref="paper",
-                    text=f"Dawka #{int(row['Dose_nr'])}",
-                    showarrow=False,
-                    textangle=0,
-                    xanchor="left"
-                )
-        
-        fig.update_layout(
-            title="Wyniki badań krwi",
-            xaxis_title="Data",
-            yaxis_title="Wartość",
-            legend_title="Parametry",
-            plot_bgcolor='white'
-        )
-        
-        return fig
+    @memoize
+    def update_blood_graph(blood_data, med_data, tests):
+        # DataFrame'y z rejestru są współdzielone - tylko odczyt
+        return build_blood_figure(registry.get(blood_data), registry.get(med_data), tests)
 
     @app.callback(
         Output("blood-stats", "children"),
         Input("blood-data", "data")
     )
+    @memoize
     def update_blood_stats(data):
-        df = pd.DataFrame(data)
+        df = registry.get(data)
         if df.empty:
             return html.Div("Brak danych")
         
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Jeden przebieg groupby dla wszystkich badań; ostatni wynik i jego norma
+        # z ostatniego wiersza (tabela posortowana po dacie)
+        stats = df.groupby(['test', 'unit'], sort=True).agg(
+            count=('value', 'size'),
+            avg=('value', 'mean'),
+            min=('value', 'min'),
+            max=('value', 'max'),
+            last=('value', 'last'),
+            ref_min=('ref_min', 'last'),
+            ref_max=('ref_max', 'last')
+        )
+        out_of_range = (stats['last'] < stats['ref_min']) | (stats['last'] > stats['ref_max'])
         
         stats_rows = []
-        for col in df.columns:
-            if col != 'Date':
-                avg_val = df[col].mean()
-                min_val = df[col].min()
-                max_val = df[col].max()
-                
-                row = html.Tr([
-                    html.Td(col),
-                    html.Td(f"{avg_val:.2f}"),
-                    html.Td(f"{min_val:.2f}"),
-                    html.Td(f"{max_val:.2f}")
-                ])
-                stats_rows.append(row)
+        for ((test, unit), row), flagged in zip(stats.iterrows(), out_of_range):
+            stats_rows.append(html.Tr([
+                html.Td(test_label(test, unit)),
+                html.Td(int(row['count'])),
+                html.Td(f"{row['avg']:.2f}"),
+                html.Td(f"{row['min']:.2f}"),
+                html.Td(f"{row['max']:.2f}"),
+                html.Td(f"{row['last']:.2f}", className="text-danger" if flagged else None),
+                html.Td(reference_label(row['ref_min'], row['ref_max']))
+            ]))
         
         table = dbc.Table(
             [
                 html.Thead(html.Tr([
                     html.Th("Parametr"),
+                    html.Th("Pomiary"),
                     html.Th("Średnia"),
                     html.Th("Minimum"),
-                    html.Th("Maksimum")
+                    html.Th("Maksimum"),
+                    html.Th("Ostatni"),
+                    html.Th("Norma")
                 ])),
                 html.Tbody(stats_rows)
             ],
@@ -1,18 +1,25 @@
 #!/usr/bin/env python3
 # copyright: marekkoc
 # Created: 2025-05-11
-# Updated: 2025-05-11
+# Updated: 2026-10-18
 
 from dash import dcc, html, Input, Output, callback
 import dash_bootstrap_components as dbc
 import pandas as pd
 
+from data_store import registry, memoize
+
+LAB_HEADERS = {
+    'date': 'Data', 'lab': 'Laboratorium', 'test': 'Badanie', 'value': 'Wynik',
+    'unit': 'Jednostka', 'ref_min': 'Norma min', 'ref_max': 'Norma max'
+}
+
 def get_layout():
     """Zwraca layout zakładki z tabelami danych"""
     return html.Div([
         html.H3("Dane poboru leku"),
         html.Div(id="medication-table"),
-        html.H3("Dane badań krwi", className="mt-4"),
+        html.H3("Wyniki badań", className="mt-4"),
         html.Div(id="blood-table")
     ])
 
@@ -23,13 +30,14 @@ def register_callbacks(app):
         Output("medication-table", "children"),
         Input("medication-data", "data")
     )
+    @memoize
     def update_medication_table(data):
-        df = pd.DataFrame(data)
+        df = registry.get(data)
         if df.empty:
             return html.Div("Brak danych")
         
-        # Formatuj daty do wyświetlenia
-        df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+        # Formatuj daty do wyświetlenia (na kopii - dane w rejestrze są współdzielone)
+        df = df.assign(Date=df['Date'].dt.strftime('%Y-%m-%d'))
         
         return dbc.Table.from_dataframe(df, striped=True, bordered=True, hover=True)
 
@@ -37,15 +45,17 @@ def register_callbacks(app):
         Output("blood-table", "children"),
         Input("blood-data", "data")
     )
+    @memoize
     def update_blood_table(data):
-        df = pd.DataFrame(data)
+        df = registry.get(data)
         if df.empty:
             return html.Div("Brak danych")
         
-        # Formatuj daty i wartości liczbowe
-        df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+        # Formatuj daty i wartości liczbowe (na kopii), polskie nagłówki kolumn
+        df = df.assign(date=df['date'].dt.strftime('%Y-%m-%d'))
         numeric_cols = df.select_dtypes(include=['float64']).columns
         if len(numeric_cols) > 0:
             df[numeric_cols] = df[numeric_cols].round(2)
+        df = df.rename(columns=LAB_HEADERS)
         
         return dbc.Table.from_dataframe(df, striped=True, bordered=True, hover=True)
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 # copyright: marekkoc
 # Created: 2025-05-11
-# Updated: 2025-05-11
+# Updated: 2026-10-18
 
 from dash import dcc, html, Input, Output, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import pandas as pd
 
+from data_store import registry, memoize
+
 def get_layout():
     """Zwraca layout zakładki z danymi o leku"""
     return html.Div([
@@ -22,13 +24,13 @@ def register_callbacks(app):
         Output("medication-graph", "figure"),
         Input("medication-data", "data")
     )
+    @memoize
     def update_medication_graph(data):
-        df = pd.DataFrame(data)
+        # DataFrame z rejestru jest współdzielony - tylko odczyt
+        df = registry.get(data)
         if df.empty:
             return go.Figure()
         
-        df['Date'] = pd.to_datetime(df['Date'])
-        
         fig = go.Figure()
         fig.add_trace(go.Scatter(
             x=df['Date'],
@@ -52,15 +54,14 @@ def register_callbacks(app):
         Output("medication-stats", "children"),
         Input("medication-data", "data")
     )
+    @memoize
     def update_medication_stats(data):
-        df = pd.DataFrame(data)
+        df = registry.get(data)
         if df.empty or len(df) < 2:
             return html.Div("Niewystarczające dane")
         
-        df['Date'] = pd.to_datetime(df['Date'])
         df = df.sort_values('Date')
-        df['Days_Since_Last'] = (df['Date'] - df['Date'].shift(1)).dt.days
-        avg_interval = df['Days_Since_Last'].dropna().mean()
+        avg_interval = df['Date'].diff().dt.days.dropna().mean()
         
         last_dose = df.iloc[-1]
         last_date = last_dose['Date'].strftime('%Y-%m-%d')
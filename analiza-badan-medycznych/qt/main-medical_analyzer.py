@@ -11,6 +11,14 @@ from PyQt5.QtCore import Qt, QAbstractTableModel
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+# columnar_cache.py jest wspólny z aplikacją Dash (katalog wyżej)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from columnar_cache import cached_read
+
+def parse_results_csv(file_name):
+    """Parsuje CSV z wynikami badań (kolumna Data + parametry)"""
+    return pd.read_csv(file_name, parse_dates=['Data'])
+
 # Model dla wyświetlania danych w tabeli
 class PandasModel(QAbstractTableModel):
     def __init__(self, data):
@@ -169,8 +177,8 @@ class MedicalAnalyzer(QMainWindow):
                                                  options=options)
         if fileName:
             try:
-                # Wczytanie danych
-                self.data = pd.read_csv(fileName, parse_dates=['Data'])
+                # Wczytanie danych (z cache kolumnowego, jeśli plik się nie zmienił)
+                self.data = cached_read(fileName, 'analyzer', parse_results_csv)
                 self.data.sort_values('Data', inplace=True)
                 
                 # Konwersja dat do formatu YYYY-MM-DD (bez godzin)
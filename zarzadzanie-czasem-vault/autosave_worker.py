@@ -0,0 +1,82 @@
+"""
+Automatyczny zapis w osobnym wątku.
+
+Zmiany z siatki są zbierane w wątku GUI, a zapis do dziennika
+i kompaktowanie wykonuje AutosaveWorker w QThread. Zapis jest opóźniany
+(debounce), więc seria kliknięć kończy się jednym zapisem.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+
+class AutosaveWorker(QObject):
+    saved = pyqtSignal()
+    # Nieudany zapis - komunikat błędu dla wątku GUI
+    failed = pyqtSignal(str)
+
+    def __init__(self, journal):
+        super().__init__()
+        self.journal = journal
+
+    @pyqtSlot(list, object)
+    def save(self, records, snapshot):
+        """Dopisuje zmiany do dziennika; snapshot (jeśli podany) zastępuje plik autosave.
+
+        Snapshot zawiera już wszystkie zmiany z records, więc wtedy dziennik nie
+        jest dopisywany - przy nieudanym snapshocie (np. po zmianie rozdzielczości)
+        na dysku zostaje spójna para: stary snapshot i stary dziennik.
+        """
+        try:
+            if snapshot is not None:
+                self.journal.compact(snapshot)
+            else:
+                self.journal.append(records)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.saved.emit()
+
+    @pyqtSlot()
+    def finish(self):
+        # Wywoływane przez kolejkę zdarzeń, więc wcześniejsze zapisy są już wykonane
+        QThread.currentThread().quit()
+
+
+class AutosaveService(QObject):
+    save_requested = pyqtSignal(list, object)
+    stop_requested = pyqtSignal()
+
+    def __init__(self, journal, delay_ms=2000, parent=None):
+        super().__init__(parent)
+        self.worker = AutosaveWorker(journal)
+        self.thread = QThread()
+        self.worker.moveToThread(self.thread)
+        self.save_requested.connect(self.worker.save)
+        self.stop_requested.connect(self.worker.finish)
+        self.thread.start()
+
+        # Opóźniony zapis - każde kolejne wywołanie schedule() przesuwa termin
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+
+    def schedule(self):
+        self.timer.start()
+
+    def submit(self, records, snapshot=None):
+        """Przekazuje zapis do wątku roboczego (po stop() - zapis synchroniczny)."""
+        self.timer.stop()
+        if self.thread.isRunning():
+            self.save_requested.emit(records, snapshot)
+        else:
+            self.worker.save(records, snapshot)
+
+    def stop(self):
+        """Kończy wątek po wykonaniu zaległych zapisów."""
+        self.timer.stop()
+        if self.thread.isRunning():
+            self.stop_requested.emit()
+            self.thread.wait()
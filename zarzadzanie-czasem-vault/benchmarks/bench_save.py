@@ -0,0 +1,124 @@
+"""
+Benchmark zapisu pliku autosave: stary custom_json_format kontra write_vault.
+
+Generuje syntetyczne dane (10k+ dni) i mierzy czas zapisu oraz szczytowe
+zużycie pamięci. Uruchomienie:
+
+    python benchmarks/bench_save.py
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from day_grid import ActivityTable
+from vault_format import parse_days, write_vault
+
+ACTIVITIES = ["Praca", "Posilek", "Zdrowie", "Rozrywka", "Prace-domowe", "Rozwoj-osobisty"]
+TABLE = ActivityTable({"name": name} for name in ACTIVITIES)
+
+
+def make_vault(days_count, seed=42):
+    """Tworzy syntetyczne dane z losowo wypełnionymi dniami."""
+    rng = random.Random(seed)
+    days = {}
+    start = datetime.date(2000, 1, 1).toordinal()
+    for i in range(days_count):
+        date = datetime.date.fromordinal(start + i).isoformat()
+        day_data = {}
+        for row in range(6, 23):
+            for col in range(6):
+                name = rng.choice(ACTIVITIES)
+                day_data.setdefault(name, []).append({"row": row, "col": col})
+        days[date] = day_data
+    return {"created_at": "2025-02-27T15:36:49", "updated_at": "2025-07-05T11:10:08", "days": days}
+
+
+def old_custom_json_format(data):
+    """Kopia poprzedniej implementacji TimeManagementApp.custom_json_format."""
+    json_str = json.dumps(data, ensure_ascii=False)
+    parsed = json.loads(json_str)
+    result = "{\n"
+    if "created_at" in parsed:
+        result += f'  "created_at": "{parsed["created_at"]}",\n'
+    if "updated_at" in parsed:
+        result += f'  "updated_at": "{parsed["updated_at"]}",\n'
+    result += '  "days": {\n'
+    days_items = list(parsed["days"].items())
+    for i, (date, day_data) in enumerate(days_items):
+        result += f'    "{date}": {{\n'
+        day_activities = list(day_data.items())
+        for j, (activity_name, squares) in enumerate(day_activities):
+            result += f'      "{activity_name}": [\n'
+            for k, square in enumerate(squares):
+                square_str = f'        {{"row": {square["row"]}, "col": {square["col"]}}}'
+                if k < len(squares) - 1:
+                    square_str += ','
+                result += square_str + '\n'
+            result += '      ]'
+            if j < len(day_activities) - 1:
+                result += ','
+            result += '\n'
+        result += '    }'
+        if i < len(days_items) - 1:
+            result += ','
+        result += '\n'
+    result += '  }\n'
+    result += '}'
+    return result
+
+
+def save_old(data, file_name):
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write(old_custom_json_format(data))
+
+
+def save_new(data, file_name):
+    with open(file_name, "w", encoding="utf-8") as file:
+        write_vault(data, file, TABLE)
+
+
+def measure(save, data, file_name):
+    """Zwraca czas zapisu [s] i szczytowe zużycie pamięci [MB]."""
+    start = time.perf_counter()
+    save(data, file_name)
+    elapsed = time.perf_counter() - start
+
+    # Pamięć mierzona osobno - tracemalloc mocno spowalnia zapis
+    tracemalloc.start()
+    save(data, file_name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    tmp_dir = tempfile.mkdtemp()
+    old_file = os.path.join(tmp_dir, "old.json")
+    new_file = os.path.join(tmp_dir, "new.json")
+
+    print(f"{'dni':>8} {'plik [MB]':>10} {'stary [s]':>10} {'stary [MB]':>11} {'nowy [s]':>9} {'nowy [MB]':>10}")
+    for days_count in (10_000, 20_000, 30_000):
+        data = make_vault(days_count)
+        old_time, old_peak = measure(save_old, data, old_file)
+        # Nowy zapis działa na dniach w formacie DayGrid
+        data["days"] = parse_days(data["days"], TABLE)
+        new_time, new_peak = measure(save_new, data, new_file)
+
+        with open(old_file, encoding="utf-8") as a, open(new_file, encoding="utf-8") as b:
+            assert a.read() == b.read(), "Różny wynik zapisu"
+        size = os.path.getsize(new_file) / 2**20
+        print(f"{days_count:>8} {size:>10.1f} {old_time:>10.2f} {old_peak:>11.1f} {new_time:>9.2f} {new_peak:>10.2f}")
+
+    os.remove(old_file)
+    os.remove(new_file)
+    os.rmdir(tmp_dir)
@@ -0,0 +1,80 @@
+"""
+Benchmark czasu startu: import modelu danych i uruchomienie aplikacji,
+z wykresami wczytywanymi przy pierwszym użyciu kontra wczytywanymi od razu.
+
+Każdy pomiar to osobny proces Pythona (zimny start importów), podawana
+jest mediana z kilku uruchomień. Uruchomienie:
+
+    python benchmarks/bench_startup.py
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 5
+
+# Importy, które main-01.py wykonywał na starcie przed wydzieleniem vault_core
+EAGER_IMPORTS = (
+    "import matplotlib.pyplot\n"
+    "from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg\n"
+    "import vault_stats, stats_view\n"
+)
+
+LOAD_APP = (
+    "import importlib.util\n"
+    f"spec = importlib.util.spec_from_file_location('main01', {os.path.join(APP_DIR, 'main-01.py')!r})\n"
+    "main01 = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(main01)\n"
+)
+
+START_APP = LOAD_APP + (
+    "app = main01.QApplication([])\n"
+    "window = main01.TimeManagementApp()\n"
+    "window.autosave.stop()\n"
+    "window.journal.close()\n"
+)
+
+CASES = [
+    ("model danych (vault_core)", "import vault_core\n"),
+    ("model danych + wykresy", "import vault_core\n" + EAGER_IMPORTS),
+    ("moduł aplikacji (leniwe wykresy)", LOAD_APP),
+    ("moduł aplikacji + wykresy", EAGER_IMPORTS + LOAD_APP),
+    ("okno aplikacji (leniwe wykresy)", START_APP),
+    ("okno aplikacji + wykresy", EAGER_IMPORTS + START_APP),
+]
+
+
+def measure(code, work_dir):
+    """Mediana czasu [s] uruchomienia kodu w nowym procesie."""
+    env = dict(os.environ, PYTHONPATH=APP_DIR, QT_QPA_PLATFORM="offscreen")
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=work_dir, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    # Aplikacja startuje na kopii danych, żeby nie ruszać plików w repozytorium
+    work_dir = tempfile.mkdtemp()
+    for file_name in ("activities.json", "time_management_autosave.json"):
+        shutil.copy(os.path.join(APP_DIR, file_name), work_dir)
+
+    baseline = measure("pass\n", work_dir)
+    print(f"pusty interpreter: {baseline * 1000:.0f} ms")
+    print(f"{'przypadek':<36} {'czas [ms]':>10}")
+    for name, code in CASES:
+        print(f"{name:<36} {measure(code, work_dir) * 1000:>10.0f}")
+
+    shutil.rmtree(work_dir)
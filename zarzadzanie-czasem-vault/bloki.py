@@ -1,5 +1,8 @@
 import json
 import os
+
+from vault_groups import read_json_lenient
+
 class Bloki:
     def __init__(self, bloki_json):
         self.bloki_json = bloki_json
@@ -7,10 +10,10 @@ class Bloki:
             print(f"Plik {bloki_json} nie istnieje")
     
     def load_bloki(self):
-        with open(self.bloki_json, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            self.bloki = data["bloki"]
-            self.version = data["version"]
+        # bloki.json ma przecinek po ostatnim bloku - zwykły json.load go odrzuca
+        data = read_json_lenient(self.bloki_json)
+        self.bloki = data["bloki"]
+        self.version = data["version"]
         return self.bloki
 
     
@@ -0,0 +1,127 @@
+"""
+Zwarta reprezentacja dnia: bajt z indeksem aktywności na każdy blok czasu.
+
+Każdy dzień to tablica ROWS x kolumny bajtów (wierszami), gdzie 0 oznacza
+puste pole, a pozostałe wartości to indeksy w ActivityTable. Liczba kolumn
+zależy od rozdzielczości (5/10/15/30 minut na blok) i wynika z długości
+tablicy - domyślnie 10 minut, czyli 144 bajty. Format
+{"nazwa": [{"row": r, "col": c}, ...]} jest używany tylko przy zapisie
+i odczycie plików.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+ROWS = 24           # godziny
+COLS = 6            # bloki w godzinie (domyślna rozdzielczość)
+CELLS = ROWS * COLS
+BLOCK_MINUTES = 10  # minut na blok (domyślna rozdzielczość)
+MINUTES_PER_DAY = ROWS * 60
+RESOLUTIONS = (5, 10, 15, 30)
+EMPTY = 0
+
+
+def cells_for(block_minutes):
+    """Liczba bloków w dniu dla rozdzielczości (minut na blok)."""
+    if block_minutes not in RESOLUTIONS:
+        raise ValueError(f"Nieobsługiwana rozdzielczość: {block_minutes} min")
+    return MINUTES_PER_DAY // block_minutes
+
+
+class ActivityTable:
+    """Tabela nazwa aktywności <-> indeks (0 zarezerwowane dla pustego pola)."""
+
+    def __init__(self, activities=()):
+        self.names = [None]
+        self.indices = {}
+        for activity in activities:
+            self.index(activity["name"])
+
+    def index(self, name):
+        """Zwraca indeks aktywności, dopisując nieznaną nazwę do tabeli."""
+        if name is None:
+            return EMPTY
+        index = self.indices.get(name)
+        if index is None:
+            index = len(self.names)
+            if index > 255:
+                raise ValueError("Za dużo aktywności (maksymalnie 255)")
+            self.names.append(name)
+            self.indices[name] = index
+        return index
+
+    def name(self, index):
+        return self.names[index]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class DayGrid(bytearray):
+    """Dane jednego dnia - bajt na każdy blok czasu."""
+    __slots__ = ()
+
+    def __init__(self, source=None, block_minutes=BLOCK_MINUTES):
+        if source is None:
+            super().__init__(cells_for(block_minutes))
+        else:
+            super().__init__(source)
+
+    @property
+    def cols(self):
+        return len(self) // ROWS
+
+    @property
+    def block_minutes(self):
+        return MINUTES_PER_DAY // len(self)
+
+    def get(self, row, col):
+        return self[row * self.cols + col]
+
+    def set(self, row, col, index):
+        self[row * self.cols + col] = index
+
+    def clear(self):
+        self[:] = bytes(len(self))
+
+    def counts(self):
+        """Liczba bloków dla każdego indeksu aktywności (w kolejności wystąpienia)."""
+        return {index: self.count(index) for index in dict.fromkeys(self) if index != EMPTY}
+
+    def minutes(self, table):
+        """Minuty spędzone na każdej aktywności (nazwa -> minuty)."""
+        block_minutes = self.block_minutes
+        return {table.name(index): count * block_minutes for index, count in self.counts().items()}
+
+    @classmethod
+    def from_squares(cls, day_data, table, block_minutes=BLOCK_MINUTES):
+        """Tworzy dzień z formatu pliku {"nazwa": [{"row": r, "col": c}, ...]}."""
+        day = cls(block_minutes=block_minutes)
+        cols = day.cols
+        for activity_name, squares in day_data.items():
+            index = table.index(activity_name)
+            for square in squares:
+                day[square["row"] * cols + square["col"]] = index
+        return day
+
+    def to_squares(self, table):
+        """Zamienia dzień na format pliku (aktywności w kolejności wystąpienia)."""
+        day_data = {}
+        cols = self.cols
+        for cell, index in enumerate(self):
+            if index != EMPTY:
+                row, col = divmod(cell, cols)
+                day_data.setdefault(table.name(index), []).append({"row": row, "col": col})
+        return day_data
+
+
+def days_matrix(days, dates=None, block_minutes=BLOCK_MINUTES):
+    """Macierz numpy uint8 (dni x bloki) dla podanych dat - do analiz całej historii."""
+    import numpy as np
+
+    if dates is None:
+        dates = sorted(days)
+    cells = cells_for(block_minutes)
+    empty = bytes(cells)
+    buffer = b"".join(bytes(days[date]) if date in days else empty for date in dates)
+    return dates, np.frombuffer(buffer, dtype=np.uint8).reshape(len(dates), cells)
@@ -0,0 +1,196 @@
+"""
+Kalendarz roczny (jak wykres aktywności na GitHubie) z minutami aktywności.
+
+Dane to gotowe sumy dzienne (AggregateCache), zamienione raz na DataFrame
+dzień x aktywność oraz dzień x grupa aktywności. Wybór wymiaru, aktywności
+(grupy) i lat to operacje na tych tabelach, a
+kalendarz jest jedną siatką pcolormesh - przy tym samym zakresie lat
+podmieniane są tylko wartości siatki. Kliknięcie dnia wysyła sygnał
+date_clicked z datą yyyy-MM-dd.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import datetime
+
+import numpy as np
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSpinBox
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+from stats_view import DIMENSION_LABELS
+from vault_stats import calendar_grid
+
+ALL_ACTIVITIES = "Wszystkie"
+ALL_COLOR = "#216e39"
+WEEKDAYS = ["Pn", "Wt", "Śr", "Cz", "Pt", "Sb", "Nd"]
+MONTHS = ["Sty", "Lut", "Mar", "Kwi", "Maj", "Cze", "Lip", "Sie", "Wrz", "Paź", "Lis", "Gru"]
+
+
+class HeatmapView(QWidget):
+    """Okno kalendarza: wybór aktywności i zakresu lat, jedna siatka dla wszystkich lat."""
+
+    date_clicked = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Kalendarz aktywności")
+        self.setGeometry(150, 150, 1100, 400)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Według:"))
+        self.dimension_combo = QComboBox()
+        for _, label in DIMENSION_LABELS:
+            self.dimension_combo.addItem(label)
+        controls.addWidget(self.dimension_combo)
+        controls.addWidget(QLabel("Pokaż:"))
+        self.activity_combo = QComboBox()
+        controls.addWidget(self.activity_combo)
+        controls.addWidget(QLabel("Od roku:"))
+        self.first_year = QSpinBox()
+        controls.addWidget(self.first_year)
+        controls.addWidget(QLabel("Do roku:"))
+        self.last_year = QSpinBox()
+        controls.addWidget(self.last_year)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.figure = Figure(figsize=(11, 3))
+        self.canvas = FigureCanvas(self.figure)
+        layout.addWidget(self.canvas, 1)
+        self.status_label = QLabel("Kliknij dzień, aby przejść do niego w siatce")
+        layout.addWidget(self.status_label)
+        self.ax = self.figure.add_subplot(111)
+
+        self.frames = {}       # wymiar -> DataFrame (dzień x kolumna)
+        self.colors = {}       # wymiar -> {nazwa: kolor}
+        self.frame = None
+        self.version = None   # wersja sum, z których policzono frames
+        self.mesh = None
+        self.layout_key = None
+        self.dates = None      # daty pól siatki (NaT poza dniami)
+        self.grid = None
+
+        self.dimension_combo.currentIndexChanged.connect(self.update_choices)
+        self.activity_combo.currentIndexChanged.connect(self.redraw)
+        self.first_year.valueChanged.connect(self.redraw)
+        self.last_year.valueChanged.connect(self.redraw)
+        self.canvas.mpl_connect('button_press_event', self.on_click)
+
+    def set_data(self, frames, colors, version=None):
+        """Nowe dane: {wymiar: DataFrame (dzień x aktywność/grupa) minut} i {wymiar: kolory}."""
+        self.frames = frames
+        self.colors = colors
+        self.version = version
+        # Zakres lat: od pierwszego wpisu do ostatniego, zawsze z bieżącym rokiem
+        years = [datetime.date.today().year]
+        for frame in frames.values():
+            if len(frame):
+                years += [frame.index[0].year, frame.index[-1].year]
+        low, high = min(years), max(years)
+
+        for spin in (self.first_year, self.last_year):
+            spin.blockSignals(True)
+            spin.setRange(low, high)
+        if self.layout_key is None:
+            self.first_year.setValue(high)
+            self.last_year.setValue(high)
+        for spin in (self.first_year, self.last_year):
+            spin.blockSignals(False)
+        self.update_choices()
+
+    def dimension(self):
+        return DIMENSION_LABELS[self.dimension_combo.currentIndex()][0]
+
+    def update_choices(self):
+        """Lista aktywności albo grup dla wybranego wymiaru (z zachowaniem wyboru, jeśli jest)."""
+        self.frame = self.frames.get(self.dimension())
+        if self.frame is None:
+            return
+        self.activity_combo.blockSignals(True)
+        selected = self.activity_combo.currentText()
+        self.activity_combo.clear()
+        self.activity_combo.addItems([ALL_ACTIVITIES] + list(self.frame.columns))
+        self.activity_combo.setCurrentIndex(max(self.activity_combo.findText(selected), 0))
+        self.activity_combo.blockSignals(False)
+        self.redraw()
+
+    def selected_values(self, start, end):
+        """Minuty dziennie dla wybranej aktywności/grupy (lub sumy wszystkich) w zakresie dat."""
+        frame = self.frame.loc[start:end]
+        name = self.activity_combo.currentText()
+        if name == ALL_ACTIVITIES or name not in frame.columns:
+            return frame.index.values, frame.to_numpy().sum(axis=1), ALL_COLOR
+        colors = self.colors.get(self.dimension(), {})
+        return frame.index.values, frame[name].to_numpy(), colors.get(name, ALL_COLOR)
+
+    def redraw(self):
+        if self.frame is None:
+            return
+        first, last = sorted((self.first_year.value(), self.last_year.value()))
+        start, end = f"{first}-01-01", f"{last}-12-31"
+        dates = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+        # Dni spoza sum (przed pierwszym/po ostatnim wpisie) mają 0 minut
+        full = np.zeros(len(dates))
+        color = ALL_COLOR
+        if len(self.frame):
+            frame_dates, values, color = self.selected_values(start, end)
+            full[(frame_dates.astype("datetime64[D]") - dates[0]).astype(np.int64)] = values
+        self.grid, self.dates, labels = calendar_grid(dates, full)
+        cmap = LinearSegmentedColormap.from_list("heatmap", ["#ebedf0", color])
+        vmax = max(float(np.nanmax(self.grid)), 1.0)
+
+        layout_key = (first, last)
+        if layout_key == self.layout_key:
+            # Ten sam zakres lat - nowe wartości i kolory tej samej siatki
+            self.mesh.set_array(self.grid.ravel())
+            self.mesh.set_cmap(cmap)
+            self.mesh.set_clim(0, vmax)
+        else:
+            self.figure.clear()
+            self.ax = self.figure.add_subplot(111)
+            self.mesh = self.ax.pcolormesh(self.grid, cmap=cmap, vmin=0, vmax=vmax,
+                                           edgecolors="white", linewidth=0.5)
+            self.ax.set_aspect("equal")
+            self.ax.invert_yaxis()
+            self.set_ticks(first, labels)
+            self.figure.colorbar(self.mesh, ax=self.ax, label="Minuty", shrink=0.8)
+            self.layout_key = layout_key
+        name = self.activity_combo.currentText()
+        self.ax.set_title(f"{name}: {first}" + (f"-{last}" if last != first else ""))
+        self.canvas.draw_idle()
+
+    def set_ticks(self, first, labels):
+        # Miesiące według pierwszego roku - w kolejnych latach przesunięcie to najwyżej tydzień
+        jan1 = datetime.date(first, 1, 1)
+        month_cols = [((datetime.date(first, month, 1) - jan1).days + jan1.weekday()) // 7 + 0.5
+                      for month in range(1, 13)]
+        self.ax.set_xticks(month_cols)
+        self.ax.set_xticklabels(MONTHS)
+        self.ax.xaxis.tick_top()
+        if len(labels) == 1:
+            self.ax.set_yticks(np.arange(7) + 0.5)
+            self.ax.set_yticklabels(WEEKDAYS)
+        else:
+            self.ax.set_yticks(np.arange(len(labels)) * 8 + 3.5)
+            self.ax.set_yticklabels(labels)
+        self.ax.tick_params(length=0)
+        for spine in self.ax.spines.values():
+            spine.set_visible(False)
+
+    def on_click(self, event):
+        if event.button != 1 or event.inaxes is not self.ax or self.dates is None:
+            return
+        row, col = int(event.ydata), int(event.xdata)
+        if not (0 <= row < self.dates.shape[0] and 0 <= col < self.dates.shape[1]):
+            return
+        date = self.dates[row, col]
+        if np.isnat(date):
+            return
+        date_str = str(date)
+        self.status_label.setText(f"{date_str}: {int(self.grid[row, col])} min")
+        self.date_clicked.emit(date_str)
@@ -11,37 +11,73 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QHBoxLayout, QPushButton, QLabel, QGridLayout, 
                             QFrame, QColorDialog, QListWidget, QListWidgetItem,
                             QInputDialog, QFileDialog, QMessageBox, QDateEdit,
-                            QTabWidget)
-from PyQt5.QtGui import QColor, QPalette, QIcon
+                            QTabWidget, QShortcut, QComboBox)
+from PyQt5.QtGui import QColor, QPalette, QIcon, QKeySequence
 from PyQt5.QtCore import Qt, pyqtSignal, QDate, QTimer, QDateTime
 import json
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import os
 import datetime
 
+from vault_core import (ROWS, BLOCK_MINUTES, RESOLUTIONS, EMPTY, ActivityTable, DayGrid,
+                        format_vault, write_vault_file, read_vault, parse_days,
+                        JournalStore, SqliteVault, SqliteDays, AggregateCache,
+                        files_signature, load_activities, GroupMap, load_blocks, ChangeTracker,
+                        load_day_times, save_day_times, export_signature)
+from autosave_worker import AutosaveService
+from vault_undo import EditHistory
+from vault_merge import MergeSource, MergeReport, open_source, merge_days, merge_to_file
+
 class ColorSquare(QFrame):
-    clicked = pyqtSignal(int, int)
+    # Naciśnięcie (wiersz, kolumna, czy z Shift), przeciąganie nad kwadratem, puszczenie
+    pressed = pyqtSignal(int, int, bool)
+    dragged = pyqtSignal(int, int)
+    released = pyqtSignal()
+    
+    # Gotowe arkusze stylów dla kolorów - wspólne dla wszystkich kwadratów
+    stylesheets = {}
     
     def __init__(self, row, col):
         super().__init__()
         self.row = row
         self.col = col
         self.activity = None
+        self.color = "white"
         self.setFrameShape(QFrame.Box)
         self.setMinimumSize(30, 30)
         self.setMaximumSize(30, 30)
-        self.setStyleSheet("background-color: white; border: 1px solid black;")
+        self.setStyleSheet(self.stylesheet(self.color))
+    
+    @classmethod
+    def stylesheet(cls, color):
+        sheet = cls.stylesheets.get(color)
+        if sheet is None:
+            sheet = f"background-color: {color}; border: 1px solid black;"
+            cls.stylesheets[color] = sheet
+        return sheet
         
     def mousePressEvent(self, event):
-        self.clicked.emit(self.row, self.col)
+        if event.button() == Qt.LeftButton:
+            self.pressed.emit(self.row, self.col, bool(event.modifiers() & Qt.ShiftModifier))
+    
+    def mouseMoveEvent(self, event):
+        # Podczas przeciągania zdarzenia trafiają do kwadratu, na którym zaczęto
+        if event.buttons() & Qt.LeftButton:
+            window = self.window()
+            square = window.childAt(window.mapFromGlobal(event.globalPos()))
+            if isinstance(square, ColorSquare):
+                self.dragged.emit(square.row, square.col)
+    
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.released.emit()
         
     def set_activity(self, activity):
         self.activity = activity
-        if activity:
-            self.setStyleSheet(f"background-color: {activity['color']}; border: 1px solid black;")
-        else:
-            self.setStyleSheet("background-color: white; border: 1px solid black;")
+        color = activity['color'] if activity else "white"
+        # Styl zmieniany tylko, gdy kolor faktycznie się zmienił
+        if color != self.color:
+            self.color = color
+            self.setStyleSheet(self.stylesheet(color))
 
 class ActivityItem(QListWidgetItem):
     def __init__(self, name, color):
@@ -51,7 +87,7 @@ class ActivityItem(QListWidgetItem):
         self.setBackground(QColor(color))
 
 class TimeManagementApp(QMainWindow): 
-    def __init__(self):
+    def __init__(self, storage="json"):
         super().__init__()
         self.setWindowTitle("Zarządzanie Czasem")
         self.setGeometry(100, 100, 1000, 800)
@@ -59,15 +95,53 @@ class TimeManagementApp(QMainWindow):
         # Ścieżki do plików
         self.autosave_file = "time_management_autosave.json"
         self.activities_file = "activities.json"
+        self.blocks_file = "bloki.json"
+        self.database_file = "time_management.sqlite"
         
         # Inicjalizacja podstawowych struktur
         self.selected_activity = None
         self.current_date = QDate.currentDate()
+        self.stroke = None      # Malowany zakres: [komórka początkowa, bieżąca, indeks aktywności]
+        self.last_cell = None   # Ostatnio malowana komórka - początek zakresu dla Shift+klik
         self.data_changed = False
-        self.grid_data = [[None for _ in range(6)] for _ in range(24)]
         
-        # Najpierw wczytaj aktywności z pliku
-        self.activities = self.load_activities_from_file()
+        # Dni w pamięci to DayGrid - bajt z indeksem aktywności na każdy blok
+        # (rozdzielczość siatki, minut na blok, wczytywana razem z danymi)
+        self.activity_table = ActivityTable()
+        self.block_minutes = BLOCK_MINUTES
+        self.grid_data = DayGrid(block_minutes=self.block_minutes)
+        
+        # Najpierw wczytaj bloki (grupy aktywności) i aktywności z pliku
+        # (razem z indeksem nazwa -> aktywność i przypisaniem aktywność -> grupa)
+        self.blocks = load_blocks(self.blocks_file)
+        self.set_activities(self.load_activities_from_file())
+        
+        # Dziennik zmian - autosave dopisuje tylko zmienione komórki
+        self.journal = JournalStore(self.autosave_file, self.activity_table)
+        self.snapshot_stale = False  # Czy snapshot wymaga pełnego zapisu
+        
+        # Opcjonalna baza SQLite zamiast pliku autosave i dziennika
+        self.database = None
+        if storage == "sqlite":
+            self.database = SqliteVault(self.database_file, self.activity_table)
+        
+        # Gotowe sumy minut (dni, tygodnie, miesiące, lata) zapisywane obok danych
+        data_file = self.database_file if self.database is not None else self.autosave_file
+        self.aggregates = AggregateCache(data_file + ".aggregates", self.activity_table, groups=self.groups)
+        
+        # Czasy modyfikacji dni i komórki zmienione od ostatniego zapisu
+        self.changes = ChangeTracker(data_file)
+        self.changes.load()
+        
+        # Historia edycji do cofania/ponawiania (starsze operacje w pliku tymczasowym)
+        self.history = EditHistory()
+        self.stats_window = None
+        self.heatmap_window = None
+        
+        # Zapis w osobnym wątku, opóźniony po ostatniej zmianie
+        self.autosave = AutosaveService(self.journal, parent=self)
+        self.autosave.timer.timeout.connect(self.autosave_data)
+        self.autosave.worker.failed.connect(self.autosave_failed)
         
         # Następnie zainicjalizuj interfejs (który używa wczytanych aktywności)
         self.init_ui()
@@ -139,53 +213,143 @@ class TimeManagementApp(QMainWindow):
         stats_button.clicked.connect(self.show_statistics)
         left_layout.addWidget(stats_button)
         
+        # Kalendarz roczny - kliknięcie dnia przechodzi do niego w siatce
+        heatmap_button = QPushButton("Kalendarz roczny")
+        heatmap_button.clicked.connect(self.show_heatmap)
+        left_layout.addWidget(heatmap_button)
+        
         # Przycisk do czyszczenia wszystkich kwadratów
         clear_button = QPushButton("Wyczyść wszystko")
         clear_button.clicked.connect(self.clear_all_squares)
         left_layout.addWidget(clear_button)
         
+        # Cofanie i ponawianie zmian siatki (także Ctrl+Z / Ctrl+Y)
+        history_layout = QHBoxLayout()
+        
+        undo_button = QPushButton("Cofnij")
+        undo_button.clicked.connect(self.undo)
+        history_layout.addWidget(undo_button)
+        
+        redo_button = QPushButton("Ponów")
+        redo_button.clicked.connect(self.redo)
+        history_layout.addWidget(redo_button)
+        
+        left_layout.addLayout(history_layout)
+        
+        # Rozdzielczość siatki - zmiana przelicza całą historię
+        resolution_layout = QHBoxLayout()
+        resolution_layout.addWidget(QLabel("Rozdzielczość:"))
+        self.resolution_combo = QComboBox()
+        for block_minutes in RESOLUTIONS:
+            self.resolution_combo.addItem(f"{block_minutes} min")
+        self.resolution_combo.setCurrentIndex(RESOLUTIONS.index(self.block_minutes))
+        self.resolution_combo.currentIndexChanged.connect(self.change_resolution)
+        resolution_layout.addWidget(self.resolution_combo)
+        left_layout.addLayout(resolution_layout)
+        QShortcut(QKeySequence.Undo, self, self.undo)
+        QShortcut(QKeySequence.Redo, self, self.redo)
+        
         # Prawy panel z siatką czasu
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
+        self.grid_panel = right_panel
         
         # Etykiety godzin i nagłówek
-        grid_layout = QGridLayout()
-        grid_layout.setSpacing(2)
+        self.grid_layout = QGridLayout()
+        self.grid_layout.setSpacing(2)
+        self.squares = []
+        self.build_grid()
+        
+        right_layout.addLayout(self.grid_layout)
+        
+        # Dodaj panele do głównego układu
+        main_layout.addWidget(left_panel, 1)
+        main_layout.addWidget(right_panel, 3)
+        
+        # Podłączenie zdarzeń myszy do głównego okna
+        self.setMouseTracking(True)
         
-        # Dodaj etykiety dla 10-minutowych bloków
-        for col in range(6):
-            minutes = col * 10
+        # Podłączenie zdarzenia zamknięcia okna
+        self.closeEvent = self.handle_close_event
+    
+    def build_grid(self):
+        """Tworzy etykiety i kwadraty siatki dla bieżącej rozdzielczości (usuwa poprzednie)."""
+        while self.grid_layout.count():
+            self.grid_layout.takeAt(0).widget().deleteLater()
+        
+        # Dodaj etykiety dla bloków w godzinie
+        cols = self.grid_data.cols
+        for col in range(cols):
+            minutes = col * self.block_minutes
             label = QLabel(f"{minutes:02d}")
             label.setAlignment(Qt.AlignCenter)
-            grid_layout.addWidget(label, 0, col + 1)
+            self.grid_layout.addWidget(label, 0, col + 1)
         
         # Dodaj etykiety godzin i kwadraty kolorów
         self.squares = []
-        for row in range(24):
+        for row in range(ROWS):
             hour_label = QLabel(f"{row:02d}:00")
             hour_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            grid_layout.addWidget(hour_label, row + 1, 0)
+            self.grid_layout.addWidget(hour_label, row + 1, 0)
             
             row_squares = []
-            for col in range(6):
+            for col in range(cols):
                 square = ColorSquare(row, col)
-                square.clicked.connect(self.square_clicked)
+                square.pressed.connect(self.square_pressed)
+                square.dragged.connect(self.square_dragged)
+                square.released.connect(self.square_released)
                 square.setMouseTracking(True)  # Włączenie śledzenia myszy
-                grid_layout.addWidget(square, row + 1, col + 1)
+                self.grid_layout.addWidget(square, row + 1, col + 1)
                 row_squares.append(square)
             self.squares.append(row_squares)
+    
+    def set_block_minutes(self, block_minutes):
+        """Ustawia rozdzielczość danych (minut na blok); siatka przebudowywana tylko przy zmianie."""
+        self.block_minutes = block_minutes
+        self.aggregates.block_minutes = block_minutes
+        if self.grid_data.block_minutes != block_minutes:
+            # Nowe kwadraty są puste - load_day_data odświeży je względem pustego dnia
+            self.grid_data = DayGrid(block_minutes=block_minutes)
+            self.stroke = None
+            self.last_cell = None
+            self.build_grid()
+        self.resolution_combo.blockSignals(True)
+        self.resolution_combo.setCurrentIndex(RESOLUTIONS.index(block_minutes))
+        self.resolution_combo.blockSignals(False)
+    
+    def change_resolution(self, combo_index):
+        """Zmiana rozdzielczości z listy: przeliczenie całej historii (vault_resample)."""
+        block_minutes = RESOLUTIONS[combo_index]
+        if block_minutes == self.block_minutes:
+            return
+        message = (f"Zmienić rozdzielczość siatki z {self.block_minutes} na {block_minutes} min?\n"
+                   "Cała historia zostanie przeliczona.")
+        if self.block_minutes % block_minutes:
+            message += ("\n\nPrzy grubszej rozdzielczości czas aktywności w dniu może zmienić się "
+                        f"o mniej niż {block_minutes} min (zaokrąglenie do pełnych bloków).")
+        reply = QMessageBox.question(self, "Rozdzielczość", message, QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            self.set_block_minutes(self.block_minutes)
+            return
         
-        right_layout.addLayout(grid_layout)
-        
-        # Dodaj panele do głównego układu
-        main_layout.addWidget(left_panel, 1)
-        main_layout.addWidget(right_panel, 3)
+        # Przeliczenie wektorowe (numpy) wczytywane przy pierwszym użyciu
+        from vault_resample import resample_days
+        self.update_memory_data()
+        days = resample_days(self.all_data["days"], self.block_minutes, block_minutes)
+        self.all_data["days"] = days
+        self.all_data["block_minutes"] = block_minutes
+        self.all_data["updated_at"] = self.get_current_datetime()
         
-        # Podłączenie zdarzeń myszy do głównego okna
-        self.setMouseTracking(True)
+        # Dane podmienione w całości - pełny zapis, nowe sumy i historia cofania
+        self.set_block_minutes(block_minutes)
+        self.snapshot_stale = True
+        self.changes.clear_dirty()
+        self.aggregates.rebuild(days)
+        self.history.clear()
+        self.load_day_data()
         
-        # Podłączenie zdarzenia zamknięcia okna
-        self.closeEvent = self.handle_close_event
+        self.data_changed = True
+        self.autosave.schedule()
     
     def update_activity_list(self):
         self.activity_list.clear()
@@ -194,13 +358,8 @@ class TimeManagementApp(QMainWindow):
                 # Sprawdź, czy activity jest słownikiem
                 if isinstance(activity, dict) and "name" in activity and "color" in activity:
                     item = ActivityItem(activity["name"], activity["color"])
-                    # Upewnij się, że kolor jest poprawny
-                    color = QColor(activity["color"])
-                    if color.isValid():
-                        item.setBackground(color)
-                    else:
-                        # Użyj domyślnego koloru, jeśli podany jest nieprawidłowy
-                        item.setBackground(QColor("#CCCCCC"))
+                    # Kolor z indeksu (nieprawidłowe kolory zastąpione domyślnym)
+                    item.setBackground(self.activity_qcolors[activity["name"]])
                     self.activity_list.addItem(item)
                 else:
                     print(f"Błąd: Nieprawidłowy format aktywności: {activity}")
@@ -209,51 +368,141 @@ class TimeManagementApp(QMainWindow):
                 print(f"Błąd podczas dodawania aktywności: {str(e)}")
     
     def select_activity(self, item):
-        for i, activity in enumerate(self.activities):
-            if activity["name"] == item.name:
-                self.selected_activity = activity
-                break
+        activity = self.find_activity(item.name)
+        if activity is not None:
+            self.selected_activity = activity
     
-    def square_clicked(self, row, col):
+    def square_pressed(self, row, col, shift):
+        """Początek malowania: kliknięcie, przeciąganie lub Shift+klik (zakres od ostatniej komórki)."""
+        cell = row * self.grid_data.cols + col
+        current_index = self.grid_data[cell]
         if not self.selected_activity:
-            if self.grid_data[row][col] is not None:
-                # Jeśli kliknięto na już zaznaczony kwadrat, odznacz go
-                self.grid_data[row][col] = None
-                self.squares[row][col].set_activity(None)
-                self.data_changed = True  # Oznacz, że dane zostały zmienione
-            else:
+            if current_index == EMPTY:
                 QMessageBox.warning(self, "Ostrzeżenie", "Najpierw wybierz aktywność!")
-            return
-            
-        # Jeśli kliknięto na już zaznaczony kwadrat z tą samą aktywnością, odznacz go
-        if (self.grid_data[row][col] is not None and 
-            isinstance(self.grid_data[row][col], dict) and 
-            self.grid_data[row][col]["name"] == self.selected_activity["name"]):
-            self.grid_data[row][col] = None
-            self.squares[row][col].set_activity(None)
+                return
+            index = EMPTY
         else:
-            # W przeciwnym razie ustaw wybraną aktywność
-            self.grid_data[row][col] = self.selected_activity
-            self.squares[row][col].set_activity(self.selected_activity)
+            # Zaczęcie na komórce z tą samą aktywnością czyści zakres
+            selected_index = self.activity_table.index(self.selected_activity["name"])
+            index = EMPTY if current_index == selected_index else selected_index
         
-        self.data_changed = True  # Oznacz, że dane zostały zmienione
+        anchor = self.last_cell if shift and self.last_cell is not None else cell
+        self.stroke = [anchor, cell, index]
+        self.preview_range(anchor, cell, index)
+    
+    def square_dragged(self, row, col):
+        cell = row * self.grid_data.cols + col
+        if self.stroke is None or self.stroke[1] == cell:
+            return
+        self.stroke[1] = cell
+        self.preview_range(*self.stroke)
+    
+    def square_released(self):
+        if self.stroke is None:
+            return
+        anchor, cell, index = self.stroke
+        self.stroke = None
+        self.last_cell = cell
+        self.set_range(anchor, cell, index)
+        self.data_changed = True
+        self.autosave.schedule()
+    
+    def preview_range(self, first, last, index):
+        """Podgląd malowanego zakresu - zmienia tylko widok, model dopiero po puszczeniu."""
+        start, stop = sorted((first, last))
+        activity = self.find_activity(self.activity_table.name(index))
+        cols = self.grid_data.cols
+        for cell, current_index in enumerate(self.grid_data):
+            row, col = divmod(cell, cols)
+            if start <= cell <= stop:
+                self.squares[row][col].set_activity(activity)
+            else:
+                self.squares[row][col].set_activity(self.find_activity(self.activity_table.name(current_index)))
+    
+    def set_range(self, first, last, index):
+        """Ustawia aktywność w zakresie komórek (w kolejności czasu) jedną operacją."""
+        start, stop = sorted((first, last))
+        self.write_cells(start, bytes([index]) * (stop - start + 1))
+    
+    def write_cells(self, start, values, record=True):
+        """Zapisuje ciągły zakres komórek bieżącego dnia jedną operacją.
+        
+        Siatka, sumy i śledzenie zmian aktualizowane są raz dla całego zakresu,
+        widok odświeżany jednym przemalowaniem, a zmiana trafia do historii cofania.
+        """
+        date_str = self.get_date_string()
+        stop = start + len(values)
+        old_cells = bytes(self.grid_data[start:stop])
+        self.grid_data[start:stop] = values
+        
+        changed = [start + offset for offset, (old_index, new_index) in enumerate(zip(old_cells, values))
+                   if old_index != new_index]
+        if changed:
+            self.changes.touch_cells(date_str, changed)
+            self.aggregates.update_day(date_str, self.grid_data)
+            if record:
+                self.history.record(date_str, start, old_cells, values)
+        
+        # Podgląd malowania mógł zmienić kolory także niezmienionych komórek
+        self.grid_panel.setUpdatesEnabled(False)
+        cols = self.grid_data.cols
+        for cell in range(start, stop):
+            row, col = divmod(cell, cols)
+            self.squares[row][col].set_activity(self.find_activity(self.activity_table.name(self.grid_data[cell])))
+        self.grid_panel.setUpdatesEnabled(True)
+    
+    def undo(self):
+        operation = self.history.undo()
+        if operation is not None:
+            self.apply_operation(operation.date, operation.start, operation.old)
+    
+    def redo(self):
+        operation = self.history.redo()
+        if operation is not None:
+            self.apply_operation(operation.date, operation.start, operation.new)
+    
+    def apply_operation(self, date_str, start, values):
+        """Cofnięcie/ponowienie: przejście do dnia operacji i zapis komórek bez nowego wpisu w historii."""
+        if date_str != self.get_date_string():
+            self.date_edit.setDate(QDate.fromString(date_str, "yyyy-MM-dd"))
+        self.write_cells(start, values, record=False)
+        self.data_changed = True
+        self.autosave.schedule()
+    
+    def set_activities(self, activities):
+        """Ustawia listę aktywności i przebudowuje indeks nazwa -> aktywność/kolor."""
+        self.activities = activities
+        self.activity_by_name = {}
+        self.activity_colors = {}
+        self.activity_qcolors = {}
+        for activity in activities:
+            if isinstance(activity, dict) and "name" in activity and "color" in activity:
+                name = activity["name"]
+                self.activity_by_name[name] = activity
+                self.activity_colors[name] = activity["color"]
+                color = QColor(activity["color"])
+                self.activity_qcolors[name] = color if color.isValid() else QColor("#CCCCCC")
+                self.activity_table.index(name)
+        
+        # Grupy aktywności (bloki) - sumy grup przeliczane z sum aktywności
+        self.groups = GroupMap(activities, self.blocks)
+        if hasattr(self, 'aggregates'):
+            self.aggregates.set_groups(self.groups)
+    
+    def find_activity(self, activity_name):
+        """Zwraca słownik aktywności o podanej nazwie lub None."""
+        return self.activity_by_name.get(activity_name)
     
     def update_grid(self):
-        for row in range(24):
-            for col in range(6):
-                if self.grid_data[row][col] is not None:
-                    activity_name = self.grid_data[row][col]["name"]
+        for row in range(ROWS):
+            for col in range(self.grid_data.cols):
+                index = self.grid_data.get(row, col)
+                if index != EMPTY:
                     # Znajdź aktualną aktywność o tej samej nazwie
-                    found = False
-                    for activity in self.activities:
-                        if isinstance(activity, dict) and "name" in activity and activity["name"] == activity_name:
-                            self.grid_data[row][col] = activity
-                            self.squares[row][col].set_activity(activity)
-                            found = True
-                            break
-                    if not found:
-                        self.grid_data[row][col] = None
-                        self.squares[row][col].set_activity(None)
+                    activity = self.find_activity(self.activity_table.name(index))
+                    if activity is None:
+                        self.grid_data.set(row, col, EMPTY)
+                    self.squares[row][col].set_activity(activity)
     
     def change_date(self, date):
         # Zapisz dane bieżącego dnia do pamięci (nie do pliku)
@@ -282,38 +531,26 @@ class TimeManagementApp(QMainWindow):
             self.all_data = {
                 "created_at": self.get_current_datetime(),
                 "updated_at": self.get_current_datetime(),
+                "block_minutes": self.block_minutes,
                 "days": {}
             }
         
         # Aktualizuj datę ostatniej aktualizacji
         self.all_data["updated_at"] = self.get_current_datetime()
         
-        # Przygotuj dane dla bieżącego dnia
-        day_data = {}
-        for row in range(24):
-            for col in range(6):
-                if self.grid_data[row][col]:
-                    activity_name = self.grid_data[row][col]["name"]
-                    
-                    # Dodaj aktywność do słownika, jeśli jeszcze nie istnieje
-                    if activity_name not in day_data:
-                        day_data[activity_name] = []
-                    
-                    # Dodaj współrzędne kwadratu do listy dla danej aktywności
-                    day_data[activity_name].append({
-                        "row": row,
-                        "col": col
-                    })
-        
-        # Zapisz dane dla bieżącego dnia
-        self.all_data["days"][date_str] = day_data
+        # Zapisz kopię danych bieżącego dnia (DayGrid, bajt na blok)
+        self.all_data["days"][date_str] = DayGrid(self.grid_data)
+        self.aggregates.update_day(date_str, self.grid_data)
     
     def get_current_datetime(self):
         """Zwraca aktualną datę i czas w formacie ISO."""
         return datetime.datetime.now().isoformat()
     
     def autosave_data(self):
-        """Automatycznie zapisuje dane do pliku autosave."""
+        """Automatycznie zapisuje dane do pliku autosave (dopisuje zmiany do dziennika).
+        
+        Sam zapis wykonuje wątek roboczy - tutaj tylko zbierane są zmiany.
+        """
         if not self.data_changed:
             return  # Nie zapisuj, jeśli dane nie zostały zmienione
         
@@ -321,12 +558,33 @@ class TimeManagementApp(QMainWindow):
         self.update_memory_data()
         
         try:
-            # Zapisz dane do pliku autosave
-            with open(self.autosave_file, "w", encoding="utf-8") as file:
-                file.write(self.custom_json_format(self.all_data))
+            if self.database is not None:
+                # Baza SQLite - dni zapisywane są przy update_memory_data, tu tylko commit
+                if self.snapshot_stale:
+                    # Dane podmienione w całości (Wczytaj -> Zastąp)
+                    self.database.import_data(self.all_data, replace=True)
+                    self.all_data["days"] = SqliteDays(self.database)
+                    self.snapshot_stale = False
+                self.database.set_meta("updated_at", self.all_data["updated_at"])
+                self.database.commit()
+                self.changes.clear_dirty()
+                self.data_changed = False
+                print(f"Automatyczny zapis (SQLite): {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                return True
+            
+            # Scal dziennik ze snapshotem, gdy urósł lub dane podmieniono
+            snapshot = None
+            if self.snapshot_stale or self.journal.needs_compaction():
+                snapshot = JournalStore.snapshot(self.all_data)
+                self.snapshot_stale = False
+            
+            # Przekaż zmienione komórki (bieżące wartości) do wątku zapisu
+            records = self.changes.take_records(self.all_data["days"], self.activity_table)
             
-            # Zresetuj flagę zmiany danych
+            # Zresetuj flagę zmiany danych przed zapisem - zapis synchroniczny (po stop())
+            # zgłasza błąd od razu i autosave_failed musi móc ją ponownie ustawić
             self.data_changed = False
+            self.autosave.submit(records, snapshot)
             
             print(f"Automatyczny zapis: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             return True
@@ -337,16 +595,47 @@ class TimeManagementApp(QMainWindow):
             # QMessageBox.warning(self, "Ostrzeżenie", error_msg)
             return False
     
+    def autosave_failed(self, error):
+        print(f"Błąd automatycznego zapisu: {error}")
+        # Zmiany mogły nie trafić do dziennika - następny zapis zapisze wszystko
+        self.snapshot_stale = True
+        self.data_changed = True
+        self.autosave.schedule()
+    
+    def load_database(self):
+        """Wczytuje dane z bazy SQLite (przy pierwszym użyciu importuje plik autosave)."""
+        try:
+            if self.database.is_empty():
+                loaded_data = self.journal.load()
+                if loaded_data is not None:
+                    self.database.import_data(loaded_data)
+                    print(f"Zaimportowano dane z {self.autosave_file} do {self.database_file}")
+            
+            self.all_data = {
+                "created_at": self.database.get_meta("created_at") or self.get_current_datetime(),
+                "updated_at": self.get_current_datetime(),
+                "block_minutes": self.database.block_minutes,
+                "days": SqliteDays(self.database)
+            }
+            self.set_block_minutes(self.database.block_minutes)
+            self.load_aggregates()
+            self.load_day_data()
+        except Exception as e:
+            print(f"Błąd wczytywania bazy danych: {str(e)}")
+    
     def auto_load_data(self):
         """Automatycznie wczytuje dane z pliku autosave przy uruchomieniu."""
-        if os.path.exists(self.autosave_file):
+        if self.database is not None:
+            self.load_database()
+            return
+        
+        if os.path.exists(self.autosave_file) or os.path.exists(self.journal.journal_file):
             try:
-                # Wczytaj dane z pliku autosave
-                with open(self.autosave_file, "r", encoding="utf-8") as file:
-                    loaded_data = json.load(file)
+                # Wczytaj snapshot i odtwórz zmiany z dziennika
+                loaded_data = self.journal.load()
                 
                 # Sprawdź format pliku
-                if "days" in loaded_data:
+                if loaded_data is not None and "days" in loaded_data:
                     # Ustaw datę utworzenia, jeśli nie istnieje
                     if "created_at" not in loaded_data:
                         loaded_data["created_at"] = self.get_current_datetime()
@@ -354,8 +643,11 @@ class TimeManagementApp(QMainWindow):
                     # Ustaw datę aktualizacji
                     loaded_data["updated_at"] = self.get_current_datetime()
                     
-                    # Wczytaj dane
+                    # Wczytaj dane (w zapisanej rozdzielczości)
+                    loaded_data.setdefault("block_minutes", BLOCK_MINUTES)
                     self.all_data = loaded_data
+                    self.set_block_minutes(loaded_data["block_minutes"])
+                    self.load_aggregates()
                     
                     # Wczytaj dane dla bieżącego dnia
                     self.load_day_data()
@@ -366,61 +658,39 @@ class TimeManagementApp(QMainWindow):
             except Exception as e:
                 print(f"Błąd automatycznego wczytywania: {str(e)}")
     
+    def data_files(self):
+        """Pliki z danymi - ich sygnatura określa aktualność zapisanych sum."""
+        if self.database is not None:
+            return [self.database_file]
+        return [self.autosave_file, self.journal.journal_file, self.journal.rotated_file]
+    
+    def load_aggregates(self):
+        """Wczytuje zapisane sumy lub przelicza je, jeśli dane zmieniły się od zapisu."""
+        if not self.aggregates.load(files_signature(self.data_files())):
+            self.aggregates.rebuild(self.all_data["days"])
+            print("Przeliczono sumy aktywności")
+    
     def handle_close_event(self, event):
         """Obsługuje zdarzenie zamknięcia okna."""
-        # Automatyczny zapis przy zamykaniu aplikacji
+        # Dokończ zaległe zapisy w tle i zapisz resztę zmian synchronicznie
+        self.autosave.stop()
         self.autosave_data()
+        self.journal.close()
+        self.history.close()
+        if self.database is not None:
+            self.database.close()
+        
+        # Zapisz sumy razem z sygnaturą plików danych po ostatnim zapisie
+        try:
+            self.aggregates.save(files_signature(self.data_files()))
+            self.changes.save()
+        except Exception as e:
+            print(f"Błąd zapisu sum aktywności: {str(e)}")
         event.accept()
     
     def custom_json_format(self, data):
         """Niestandardowe formatowanie JSON."""
-        # Konwertuj dane do podstawowego JSON
-        json_str = json.dumps(data, ensure_ascii=False)
-        
-        # Wczytaj jako słownik
-        parsed = json.loads(json_str)
-        
-        # Niestandardowe formatowanie
-        result = "{\n"
-        
-        # Dodaj pola created_at i updated_at na początku
-        if "created_at" in parsed:
-            result += f'  "created_at": "{parsed["created_at"]}",\n'
-        if "updated_at" in parsed:
-            result += f'  "updated_at": "{parsed["updated_at"]}",\n'
-        
-        # Formatowanie sekcji days
-        result += '  "days": {\n'
-        days_items = list(parsed["days"].items())
-        for i, (date, day_data) in enumerate(days_items):
-            result += f'    "{date}": {{\n'
-            
-            # Formatowanie aktywności dla danego dnia
-            day_activities = list(day_data.items())
-            for j, (activity_name, squares) in enumerate(day_activities):
-                result += f'      "{activity_name}": [\n'
-                
-                # Formatowanie kwadratów dla danej aktywności
-                for k, square in enumerate(squares):
-                    square_str = f'        {{"row": {square["row"]}, "col": {square["col"]}}}'
-                    if k < len(squares) - 1:
-                        square_str += ','
-                    result += square_str + '\n'
-                
-                result += '      ]'
-                if j < len(day_activities) - 1:
-                    result += ','
-                result += '\n'
-            
-            result += '    }'
-            if i < len(days_items) - 1:
-                result += ','
-            result += '\n'
-        
-        result += '  }\n'
-        result += '}'
-        
-        return result
+        return format_vault(data, self.activity_table)
     
     def save_data(self):
         # Najpierw aktualizuj dane w pamięci
@@ -452,33 +722,34 @@ class TimeManagementApp(QMainWindow):
             
             if msgBox.clickedButton() == btnUpdate:
                 try:
-                    # Wczytaj istniejące dane
-                    with open(file_name, "r", encoding="utf-8") as file:
-                        existing_data = json.load(file)
+                    # Otwórz istniejący plik - dni czytane są po kolei podczas scalania
+                    try:
+                        existing = open_source(file_name, self.activity_table)
+                    except ValueError:
+                        existing = None
                     
-                    # Sprawdź format pliku
-                    if "days" in existing_data:
+                    if existing is not None:
                         # Zachowaj datę utworzenia
-                        if "created_at" in existing_data:
-                            self.all_data["created_at"] = existing_data["created_at"]
-                        else:
-                            self.all_data["created_at"] = self.get_current_datetime()
+                        self.all_data["created_at"] = existing.created_at or self.get_current_datetime()
                         
                         # Aktualizuj datę ostatniej aktualizacji
                         self.all_data["updated_at"] = self.get_current_datetime()
                         
-                        # Połącz dane dni, nadpisując istniejące dni jeśli się powtarzają
-                        for date_key, date_data in self.all_data["days"].items():
-                            existing_data["days"][date_key] = date_data
-                        
-                        # Aktualizuj datę ostatniej aktualizacji
-                        existing_data["updated_at"] = self.get_current_datetime()
-                        
-                        # Zapisz połączone dane w niestandardowym formacie
-                        with open(file_name, "w", encoding="utf-8") as file:
-                            file.write(self.custom_json_format(existing_data))
+                        # Scal komórka po komórce - przy konflikcie wygrywa później zmieniony dzień.
+                        # Po wcześniejszym eksporcie do tego pliku wystarczą dni zmienione od tego czasu.
+                        # Dni bez czasu zmiany (sprzed śledzenia zmian) mają czas tego eksportu -
+                        # jak dawniej bieżące dane nadpisują plik.
+                        export_key = f"export:{os.path.abspath(file_name)}"
+                        own = MergeSource("bieżące dane", self.all_data["days"],
+                                          updated_at=self.all_data["updated_at"],
+                                          created_at=self.all_data["created_at"],
+                                          dates=self.changes.since(export_key, export_signature(file_name)),
+                                          times=self.changes.day_times, block_minutes=self.block_minutes)
+                        report = merge_to_file([existing, own], file_name, self.activity_table, "lww")
+                        self.changes.mark(export_key, export_signature(file_name))
                         
-                        QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie zaktualizowane.")
+                        QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie zaktualizowane.\n\n"
+                                                + report.summary())
                     else:
                         # Nieznany format - zapytaj czy zastąpić
                         reply = QMessageBox.question(self, "Nieznany format", 
@@ -489,8 +760,8 @@ class TimeManagementApp(QMainWindow):
                             self.all_data["created_at"] = self.get_current_datetime()
                             self.all_data["updated_at"] = self.get_current_datetime()
                             
-                            with open(file_name, "w", encoding="utf-8") as file:
-                                file.write(self.custom_json_format(self.all_data))
+                            write_vault_file(self.all_data, file_name, self.activity_table)
+                            self.save_export_times(file_name)
                             QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie zapisane.")
                 except Exception as e:
                     QMessageBox.critical(self, "Błąd", f"Nie udało się zaktualizować danych: {str(e)}")
@@ -503,8 +774,8 @@ class TimeManagementApp(QMainWindow):
                     self.all_data["updated_at"] = self.get_current_datetime()
                     
                     # Zastąp plik nowymi danymi w niestandardowym formacie
-                    with open(file_name, "w", encoding="utf-8") as file:
-                        file.write(self.custom_json_format(self.all_data))
+                    write_vault_file(self.all_data, file_name, self.activity_table)
+                    self.save_export_times(file_name)
                     QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie zapisane.")
                 except Exception as e:
                     QMessageBox.critical(self, "Błąd", f"Nie udało się zapisać danych: {str(e)}")
@@ -520,8 +791,8 @@ class TimeManagementApp(QMainWindow):
                 self.all_data["updated_at"] = self.get_current_datetime()
                 
                 # Zapisz dane z pamięci do pliku w niestandardowym formacie
-                with open(file_name, "w", encoding="utf-8") as file:
-                    file.write(self.custom_json_format(self.all_data))
+                write_vault_file(self.all_data, file_name, self.activity_table)
+                self.save_export_times(file_name)
                 
                 QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie zapisane.")
                 
@@ -530,6 +801,11 @@ class TimeManagementApp(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Błąd", f"Nie udało się zapisać danych: {str(e)}")
     
+    def save_export_times(self, file_name):
+        """Zapisuje czasy zmian dni obok eksportu i zapamiętuje punkt kontrolny eksportu."""
+        save_day_times(file_name, self.changes.day_times)
+        self.changes.mark(f"export:{os.path.abspath(file_name)}", export_signature(file_name))
+    
     def load_data(self):
         # Zapytaj o nazwę pliku
         file_name, _ = QFileDialog.getOpenFileName(
@@ -540,12 +816,14 @@ class TimeManagementApp(QMainWindow):
             return
         
         try:
-            # Wczytaj dane z pliku
-            with open(file_name, "r", encoding="utf-8") as file:
-                loaded_data = json.load(file)
+            # Otwórz plik bez wczytywania wszystkich dni (Połącz czyta je po kolei)
+            try:
+                source = open_source(file_name, self.activity_table)
+            except ValueError:
+                source = None
                 
             # Sprawdź format pliku
-            if "days" in loaded_data:
+            if source is not None:
                 # Nowy format - zapytaj użytkownika co chce zrobić
                 msgBox = QMessageBox()
                 msgBox.setWindowTitle("Wybór danych")
@@ -556,6 +834,10 @@ class TimeManagementApp(QMainWindow):
                 msgBox.exec_()
 
                 if msgBox.clickedButton() == btnZastap:
+                    source.close()
+                    with open(file_name, "r", encoding="utf-8") as file:
+                        loaded_data = read_vault(file, self.activity_table)
+                    
                     # Zachowaj datę utworzenia
                     if "created_at" in loaded_data:
                         loaded_data["created_at"] = loaded_data["created_at"]
@@ -565,8 +847,14 @@ class TimeManagementApp(QMainWindow):
                     # Aktualizuj datę ostatniej aktualizacji
                     loaded_data["updated_at"] = self.get_current_datetime()
                     
-                    # Zastąp wszystkie dane w pamięci
+                    # Zastąp wszystkie dane w pamięci (razem z rozdzielczością pliku)
+                    loaded_data.setdefault("block_minutes", BLOCK_MINUTES)
                     self.all_data = loaded_data
+                    self.set_block_minutes(loaded_data["block_minutes"])
+                    self.snapshot_stale = True
+                    self.aggregates.rebuild(self.all_data["days"])
+                    self.changes.reset(load_day_times(file_name))
+                    self.history.clear()
                     
                     # Wczytaj dane dla bieżącego dnia
                     self.load_day_data()
@@ -577,52 +865,76 @@ class TimeManagementApp(QMainWindow):
                     QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie wczytane.")
                 
                 elif msgBox.clickedButton() == btnPolacz:
-                    # Jeśli nie mamy jeszcze danych w pamięci, inicjalizuj
-                    if not hasattr(self, 'all_data'):
-                        self.all_data = {
-                            "created_at": self.get_current_datetime(),
-                            "updated_at": self.get_current_datetime(),
-                            "days": {}
-                        }
+                    # Zapisz bieżący dzień do pamięci (inicjalizuje dane, jeśli ich nie ma)
+                    self.update_memory_data()
                     
                     # Zachowaj datę utworzenia
                     if "created_at" not in self.all_data:
-                        if "created_at" in loaded_data:
-                            self.all_data["created_at"] = loaded_data["created_at"]
-                        else:
-                            self.all_data["created_at"] = self.get_current_datetime()
+                        self.all_data["created_at"] = source.created_at or self.get_current_datetime()
+                    
+                    # Scal komórka po komórce tylko dni z wczytanego pliku. Bieżące dane nie mają
+                    # updated_at: dni bez czasu zmiany (sprzed śledzenia zmian) przegrywają z plikiem,
+                    # tak jak dawniej Połącz nadpisywał je dniami z pliku; wygrywają tylko dni
+                    # zmienione w aplikacji później niż zapis pliku.
+                    days = self.all_data["days"]
+                    own = MergeSource("bieżące dane", days,
+                                      dates=[date_key for date_key in source.days if date_key in days],
+                                      times=self.changes.day_times, block_minutes=self.block_minutes)
+                    report = MergeReport()
+                    try:
+                        # Dni z pliku przeliczane są na bieżącą rozdzielczość
+                        for date_key, date_data in merge_days([own, source], self.activity_table, "lww", report,
+                                                              self.block_minutes):
+                            if date_key in days and days[date_key] == date_data:
+                                continue
+                            days[date_key] = date_data
+                            self.changes.touch_day(date_key, report.day_times.get(date_key))
+                            self.aggregates.update_day(date_key, date_data)
+                    finally:
+                        source.close()
+                    self.history.clear()
                     
                     # Aktualizuj datę ostatniej aktualizacji
                     self.all_data["updated_at"] = self.get_current_datetime()
                     
-                    # Połącz dane dni, nadpisując istniejące dni jeśli się powtarzają
-                    for date_key, date_data in loaded_data["days"].items():
-                        self.all_data["days"][date_key] = date_data
-                    
                     # Wczytaj dane dla bieżącego dnia
                     self.load_day_data()
                     
                     # Oznacz, że dane zostały zmienione
                     self.data_changed = True
+                    self.autosave.schedule()
                     
-                    QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie połączone.")
+                    QMessageBox.information(self, "Sukces", "Dane zostały pomyślnie połączone.\n\n"
+                                            + report.summary())
+                
+                else:
+                    source.close()
             
             else:
                 # Stary format lub nieznany - spróbuj obsłużyć
+                with open(file_name, "r", encoding="utf-8") as file:
+                    loaded_data = read_vault(file, self.activity_table)
                 if isinstance(loaded_data, dict):
                     # To mogą być dane dzienne w starym formacie
                     # Konwertuj na nowy format
                     self.all_data = {
                         "created_at": self.get_current_datetime(),
                         "updated_at": self.get_current_datetime(),
-                        "days": loaded_data
+                        "block_minutes": BLOCK_MINUTES,
+                        "days": parse_days(loaded_data, self.activity_table)
                     }
+                    self.set_block_minutes(BLOCK_MINUTES)
+                    self.snapshot_stale = True
+                    self.aggregates.rebuild(self.all_data["days"])
+                    self.changes.reset()
+                    self.history.clear()
                     
                     # Wczytaj dane dla bieżącego dnia
                     self.load_day_data()
                     
                     # Oznacz, że dane zostały zmienione
                     self.data_changed = True
+                    self.autosave.schedule()
                     
                     QMessageBox.information(self, "Sukces", "Dane dzienne zostały pomyślnie wczytane i przekonwertowane.")
                 else:
@@ -637,176 +949,94 @@ class TimeManagementApp(QMainWindow):
         date_str = self.get_date_string()
         
         # Zbierz dane o czasie spędzonym na każdej aktywności
-        activity_times = {}
-        for row in range(24):
-            for col in range(6):
-                if self.grid_data[row][col]:
-                    activity_name = self.grid_data[row][col]["name"]
-                    if activity_name not in activity_times:
-                        activity_times[activity_name] = 0
-                    activity_times[activity_name] += 10  # 10 minut na blok
-        
-        if not activity_times:
-            QMessageBox.information(self, "Statystyki", "Brak danych do wyświetlenia.")
-            return
-        
-        # Utwórz okno z wykresem
-        stats_window = QWidget()
-        stats_window.setWindowTitle(f"Statystyki dla {date_str}")
-        stats_window.setGeometry(200, 200, 800, 600)
-        
-        layout = QVBoxLayout(stats_window)
-        
-        # Dodanie zakładek dla różnych typów statystyk
-        tabs = QTabWidget()
-        layout.addWidget(tabs)
+        # (pusty dzień daje pusty wykres kołowy - tydzień, miesiąc, rok i serie są zawsze liczone)
+        activity_times = self.grid_data.minutes(self.activity_table)
+        
+        # Wykresy (matplotlib) i obliczenia (numpy/pandas) wczytywane przy pierwszym użyciu
+        from vault_stats import date_range, daily_streaks, periods_frame, totals_frame
+        from stats_view import StatsView
+        
+        # Okno statystyk tworzone raz - kolejne otwarcia tylko aktualizują wykresy
+        if self.stats_window is None:
+            self.stats_window = StatsView()
+            self.stats_window.dimension_changed.connect(lambda by: self.show_statistics())
+        view = self.stats_window
+        view.setWindowTitle(f"Statystyki dla {date_str}")
+        
+        # Aktywności albo ich grupy (bloki) - grupy z gotowych sum i przypisania aktywność -> grupa
+        by = view.dimension()
+        colors = self.groups.colors if by == "group" else self.activity_colors
+        if by == "group":
+            activity_times = self.groups.roll_up(activity_times)
         
         # Zakładka z wykresem kołowym
-        pie_tab = QWidget()
-        pie_layout = QVBoxLayout(pie_tab)
-        
-        # Utwórz wykres kołowy
-        pie_figure = plt.figure(figsize=(8, 6))
-        pie_canvas = FigureCanvas(pie_figure)
-        pie_layout.addWidget(pie_canvas)
-        
-        pie_ax = pie_figure.add_subplot(111)
-        
-        labels = []
-        sizes = []
-        colors = []
-        
-        for activity_name, minutes in activity_times.items():
-            labels.append(f"{activity_name} ({minutes} min)")
-            sizes.append(minutes)
-            
-            # Znajdź kolor dla aktywności
-            for activity in self.activities:
-                if isinstance(activity, dict) and "name" in activity and activity["name"] == activity_name:
-                    colors.append(activity["color"])
-                    break
-            else:
-                colors.append("#CCCCCC")  # Domyślny kolor
-        
-        # Dostosowanie rozmiaru czcionki
-        plt.rcParams.update({'font.size': 10})
-        wedges, texts, autotexts = pie_ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-        
-        # Ustawienie właściwości tekstu, aby był skalowalny
-        for text in texts:
-            text.set_fontsize('medium')
-        for autotext in autotexts:
-            autotext.set_fontsize('medium')
-            
-        pie_ax.axis('equal')
-        pie_ax.set_title(f"Podział czasu dla {date_str}")
-        
-        # Dodanie funkcji do obsługi zmiany rozmiaru
-        def on_resize(event):
-            # Dostosowanie rozmiaru czcionki do wielkości wykresu
-            size = min(event.width, event.height) / 50
-            for text in texts:
-                text.set_fontsize(size)
-            for autotext in autotexts:
-                autotext.set_fontsize(size)
-            pie_figure.tight_layout()
-            
-        pie_figure.canvas.mpl_connect('resize_event', on_resize)
-        
-        pie_canvas.draw()
+        view.pie.show_pie(activity_times, colors, f"Podział czasu dla {date_str}")
         
         # Zakładka z wykresem tygodniowym
-        week_tab = QWidget()
-        week_layout = QVBoxLayout(week_tab)
-        
-        # Utwórz wykres tygodniowy
-        week_figure = plt.figure(figsize=(8, 6))
-        week_canvas = FigureCanvas(week_figure)
-        week_layout.addWidget(week_canvas)
-        
-        week_ax = week_figure.add_subplot(111)
-        
-        # Pobierz dane z całego tygodnia
-        week_data = self.get_week_data()
-        
-        # Przygotuj dane do wykresu
-        days = []
-        activity_data = {}
-        
-        for day, day_activities in week_data.items():
-            days.append(day)
-            for activity_name, minutes in day_activities.items():
-                if activity_name not in activity_data:
-                    activity_data[activity_name] = []
-                # Uzupełnij brakujące dni zerami
-                while len(activity_data[activity_name]) < len(days) - 1:
-                    activity_data[activity_name].append(0)
-                activity_data[activity_name].append(minutes)
-        
-        # Uzupełnij brakujące wartości dla wszystkich aktywności
-        for activity_name in activity_data:
-            while len(activity_data[activity_name]) < len(days):
-                activity_data[activity_name].append(0)
-        
-        # Rysuj wykres słupkowy
-        bottom = [0] * len(days)
-        for activity_name, minutes in activity_data.items():
-            # Znajdź kolor dla aktywności
-            color = "#CCCCCC"  # Domyślny kolor
-            for activity in self.activities:
-                if isinstance(activity, dict) and "name" in activity and activity["name"] == activity_name:
-                    color = activity["color"]
-                    break
-            
-            week_ax.bar(days, minutes, bottom=bottom, label=activity_name, color=color)
-            bottom = [bottom[i] + minutes[i] for i in range(len(days))]
-        
-        week_ax.set_title("Aktywności w ciągu tygodnia")
-        week_ax.set_xlabel("Dzień")
-        week_ax.set_ylabel("Czas (minuty)")
-        week_ax.legend()
-        
-        week_canvas.draw()
-        
-        # Dodaj zakładki do widgetu
-        tabs.addTab(pie_tab, "Wykres kołowy")
-        tabs.addTab(week_tab, "Wykres tygodniowy")
+        week_frame = totals_frame(self.get_week_data(by))
+        view.week.show_bars(week_frame, colors, "Aktywności w ciągu tygodnia", "Dzień")
         
-        stats_window.show()
+        # Zakładki miesięczna i roczna oraz serie - z gotowych sum dziennych i miesięcznych
+        # (bez wczytywania dni z pliku)
+        self.update_memory_data()
+        names = self.groups.names if by == "group" else self.activity_table.names[1:]
+        year = self.current_date.year()
+        month = self.current_date.month()
+        month_start = QDate(year, month, 1).toString("yyyy-MM-dd")
+        month_end = QDate(year, month, self.current_date.daysInMonth()).toString("yyyy-MM-dd")
+        year_start, year_end = f"{year}-01-01", f"{year}-12-31"
+        streaks_end = min(year_end, date_str)
+        
+        month_frame = periods_frame({day[8:]: self.aggregates.day_totals(day, by)
+                                     for day in date_range(month_start, month_end)}, names)
+        view.month.show_bars(month_frame, colors, f"Aktywności w miesiącu {month_start[:7]}", "Dzień")
+        
+        year_frame = periods_frame({f"{i:02d}": self.aggregates.month_totals(f"{year}-{i:02d}", by)
+                                    for i in range(1, 13)}, names)
+        view.year.show_bars(year_frame, colors, f"Aktywności w roku {year}", "Miesiąc")
+        
+        # Najdłuższe serie dni z aktywnością (grupą) w danym roku
+        day_totals = self.aggregates.buckets(by)[0]
+        view.set_streaks(view.cached(("streaks", by, year_start, streaks_end), self.aggregates.version,
+                                     lambda: daily_streaks(day_totals, year_start, streaks_end, names)))
+        
+        view.show()
+        view.raise_()
+    
+    def show_heatmap(self):
+        """Kalendarz lat z minutami aktywności (z gotowych sum dziennych)."""
+        from vault_stats import daily_frame
+        from heatmap_view import HeatmapView
         
-        # Zachowaj referencję do okna, aby nie zostało usunięte przez garbage collector
-        self.stats_window = stats_window
+        self.update_memory_data()
+        if self.heatmap_window is None:
+            self.heatmap_window = HeatmapView()
+            self.heatmap_window.date_clicked.connect(self.go_to_date)
+        view = self.heatmap_window
+        # Tabela dni liczona ponownie tylko po zmianie danych
+        if view.version != self.aggregates.version:
+            view.set_data({"activity": daily_frame(self.aggregates.days),
+                           "group": daily_frame(self.aggregates.group_days)},
+                          {"activity": self.activity_colors, "group": self.groups.colors},
+                          self.aggregates.version)
+        view.show()
+        view.raise_()
+    
+    def go_to_date(self, date_str):
+        self.update_memory_data()
+        self.date_edit.setDate(QDate.fromString(date_str, "yyyy-MM-dd"))
+        self.raise_()
+        self.activateWindow()
     
-    def get_week_data(self):
-        """Pobiera dane o aktywnościach z całego tygodnia."""
+    def get_week_data(self, by="activity"):
+        """Pobiera dane o aktywnościach (lub grupach) z całego tygodnia (z gotowych sum dziennych)."""
         week_data = {}
         
-        # Pobierz datę bieżącego dnia
-        current_date = self.current_date
-        
         # Pobierz dane z 7 dni (bieżący dzień i 6 poprzednich)
         for i in range(7):
-            # Oblicz datę
-            date = current_date.addDays(-i)
+            date = self.current_date.addDays(-i)
             date_str = date.toString("yyyy-MM-dd")
-            display_date = date.toString("dd.MM")
-            
-            # Sprawdź czy mamy dane w pamięci
-            if hasattr(self, 'all_data') and "days" in self.all_data:
-                if date_str in self.all_data["days"]:
-                    # Zbierz dane o czasie spędzonym na każdej aktywności
-                    activity_times = {}
-                    
-                    for activity_name, squares in self.all_data["days"][date_str].items():
-                        if activity_name not in activity_times:
-                            activity_times[activity_name] = 0
-                        activity_times[activity_name] += len(squares) * 10  # 10 minut na blok
-                    
-                    week_data[display_date] = activity_times
-                else:
-                    week_data[display_date] = {}
-            else:
-                week_data[display_date] = {}
+            week_data[date.toString("dd.MM")] = self.aggregates.day_totals(date_str, by)
         
         return week_data
 
@@ -817,13 +1047,11 @@ class TimeManagementApp(QMainWindow):
                                     QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            for row in range(24):
-                for col in range(6):
-                    self.grid_data[row][col] = None
-                    self.squares[row][col].set_activity(None)
+            self.write_cells(0, bytes(len(self.grid_data)))
             
             # Dodanie flagi zmiany danych
             self.data_changed = True
+            self.autosave.schedule()
             
             # Opcjonalnie: Informacja dla użytkownika
             QMessageBox.information(self, "Sukces", "Wszystkie kwadraty zostały wyczyszczone.")
@@ -844,11 +1072,7 @@ class TimeManagementApp(QMainWindow):
         self.date_edit.setDate(new_date)
 
     def load_day_data(self):
-        # Wyczyść siatkę
-        for row in range(24):
-            for col in range(6):
-                self.grid_data[row][col] = None
-                self.squares[row][col].set_activity(None)
+        new_grid = DayGrid(block_minutes=self.block_minutes)
         
         # Jeśli mamy dane w pamięci dla bieżącego dnia, załaduj je
         date_str = self.get_date_string()
@@ -856,55 +1080,39 @@ class TimeManagementApp(QMainWindow):
             if date_str in self.all_data["days"]:
                 day_data = self.all_data["days"][date_str]
                 
-                # Załaduj dane dla bieżącego dnia
-                for activity_name, squares in day_data.items():
-                    # Znajdź aktywność o podanej nazwie
-                    activity_found = False
-                    for activity in self.activities:
-                        if isinstance(activity, dict) and "name" in activity and activity["name"] == activity_name:
-                            # Ustaw aktywność dla wszystkich kwadratów
-                            for square_data in squares:
-                                row = square_data["row"]
-                                col = square_data["col"]
-                                self.grid_data[row][col] = activity
-                                self.squares[row][col].set_activity(activity)
-                            activity_found = True
-                            break
-                    
-                    # Jeśli nie znaleziono aktywności, wyświetl ostrzeżenie
-                    if not activity_found:
+                # Pomiń aktywności, których nie ma na bieżącej liście
+                known = bytearray(range(256))
+                for index in day_data.counts():
+                    activity_name = self.activity_table.name(index)
+                    if self.find_activity(activity_name) is None:
+                        known[index] = EMPTY
                         print(f"Ostrzeżenie: Nie znaleziono aktywności '{activity_name}' w bieżącej liście aktywności.")
+                new_grid = DayGrid(day_data.translate(known))
+        
+        # Odśwież tylko kwadraty, które różnią się od poprzedniego dnia
+        old_grid = self.grid_data
+        self.grid_data = new_grid
+        self.grid_panel.setUpdatesEnabled(False)
+        cols = new_grid.cols
+        for cell, (old_index, new_index) in enumerate(zip(old_grid, new_grid)):
+            if old_index != new_index:
+                row, col = divmod(cell, cols)
+                activity = self.find_activity(self.activity_table.name(new_index))
+                self.squares[row][col].set_activity(activity)
+        self.grid_panel.setUpdatesEnabled(True)
 
     def load_activities_from_file(self):
         """Wczytuje aktywności z pliku activities.json."""
-        try:
-            if os.path.exists(self.activities_file):
-                with open(self.activities_file, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    if "activities" in data:  # Sprawdź czy istnieje klucz "activities"
-                        activities = data["activities"]  # Pobierz listę aktywności
-                        valid_activities = []
-                        for activity in activities:
-                            if isinstance(activity, dict) and "name" in activity and "color" in activity:
-                                valid_activities.append(activity)
-                            else:
-                                print(f"Pominięto nieprawidłową aktywność: {activity}")
-                        return valid_activities
-                    else:
-                        print("Brak klucza 'activities' w pliku JSON")
-                        return []
-            else:
-                print(f"Nie znaleziono pliku {self.activities_file}")
-                return []
-        except Exception as e:
-            print(f"Błąd wczytywania aktywności: {str(e)}")
-            return []
+        return load_activities(self.activities_file)
 
     def save_activities_to_file(self, activities=None):
         """Zapisuje aktywności do pliku activities.json."""
         if activities is None:
             activities = self.activities
         
+        # Utrzymaj indeks aktywności w zgodzie z zapisaną listą (dodanie/edycja/usunięcie)
+        self.set_activities(activities)
+        
         try:
             with open(self.activities_file, "w", encoding="utf-8") as file:
                 json.dump(activities, file, ensure_ascii=False, indent=2)
@@ -943,7 +1151,7 @@ class TimeManagementApp(QMainWindow):
                     # Wczytaj aktywności z pliku autosave
                     if "activities" in data:
                         print(f"Znaleziono {len(data['activities'])} aktywności w pliku")
-                        self.activities = data["activities"]
+                        self.set_activities(data["activities"])
             else:
                 print(f"Plik {self.autosave_file} nie istnieje.")
         except Exception as e:
@@ -970,7 +1178,8 @@ class TimeManagementApp(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = TimeManagementApp()
+    # python main-01.py --sqlite - dane w bazie SQLite zamiast pliku autosave
+    window = TimeManagementApp(storage="sqlite" if "--sqlite" in sys.argv else "json")
     window.show()
     sys.exit(app.exec_())
         
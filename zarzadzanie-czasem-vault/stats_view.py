@@ -0,0 +1,204 @@
+"""
+Okno statystyk tworzone raz i używane ponownie.
+
+Figury powstają jako matplotlib.figure.Figure (poza globalnym rejestrem
+pyplot), a przy kolejnym otwarciu okna aktualizowane są tylko dane
+istniejących wykresów (kąty wycinków, wysokości słupków). Wyniki obliczeń
+dla zakresów dat są zapamiętywane razem z wersją danych, więc ponowne
+otwarcie statystyk bez zmian w danych nie liczy ani nie rysuje niczego.
+Lista "Według" przełącza wykresy między aktywnościami a ich grupami.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import numpy as np
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTabWidget, QComboBox
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+DEFAULT_COLOR = "#CCCCCC"
+LABEL_DISTANCE = 1.1
+PCT_DISTANCE = 0.6
+# Wymiary statystyk: (klucz, etykieta na liście)
+DIMENSION_LABELS = (("activity", "aktywności"), ("group", "grup (bloki)"))
+
+
+class ChartPanel(QWidget):
+    """Zakładka z jednym wykresem - figura, płótno i osie tworzone tylko raz."""
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        self.figure = Figure(figsize=(8, 6))
+        self.canvas = FigureCanvas(self.figure)
+        layout.addWidget(self.canvas)
+        self.ax = self.figure.add_subplot(111)
+
+        # Klucz narysowanych danych - ten sam klucz oznacza brak pracy
+        self.key = None
+        self.layout_key = None
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+        self.bars = {}
+
+    def show_pie(self, minutes, colors, title):
+        """Wykres kołowy {nazwa: minuty}; przy tych samych aktywnościach zmienia tylko kąty."""
+        key = (title, tuple(minutes.items()))
+        if key == self.key:
+            return
+        if not minutes:
+            # Pusty dzień - sam napis zamiast wycinków (pozostałe zakładki nie zależą od dnia)
+            self.ax.clear()
+            self.ax.axis('off')
+            self.ax.text(0.5, 0.5, "Brak danych do wyświetlenia.", ha="center", va="center",
+                         transform=self.ax.transAxes)
+            self.wedges, self.texts, self.autotexts = [], [], []
+            self.layout_key = None
+            self.ax.set_title(title)
+            self.key = key
+            self.canvas.draw_idle()
+            return
+        names = tuple(minutes)
+        sizes = np.fromiter(minutes.values(), dtype=float, count=len(minutes))
+        labels = [f"{name} ({value} min)" for name, value in minutes.items()]
+
+        if names == self.layout_key:
+            fractions = sizes / sizes.sum()
+            # Te same kąty co w Axes.pie(startangle=90)
+            theta1 = 90 + 360 * (np.cumsum(fractions) - fractions)
+            theta2 = theta1 + 360 * fractions
+            for i, wedge in enumerate(self.wedges):
+                wedge.set_theta1(theta1[i])
+                wedge.set_theta2(theta2[i])
+                angle = np.deg2rad((theta1[i] + theta2[i]) / 2)
+                x, y = np.cos(angle), np.sin(angle)
+                self.texts[i].set_position((LABEL_DISTANCE * x, LABEL_DISTANCE * y))
+                self.texts[i].set_horizontalalignment("left" if x > 0 else "right")
+                self.texts[i].set_text(labels[i])
+                self.autotexts[i].set_position((PCT_DISTANCE * x, PCT_DISTANCE * y))
+                self.autotexts[i].set_text(f"{100 * fractions[i]:.1f}%")
+        else:
+            self.ax.clear()
+            self.wedges, self.texts, self.autotexts = self.ax.pie(
+                sizes, labels=labels, colors=[colors.get(name, DEFAULT_COLOR) for name in names],
+                autopct='%1.1f%%', startangle=90,
+                labeldistance=LABEL_DISTANCE, pctdistance=PCT_DISTANCE)
+            self.ax.axis('equal')
+            self.layout_key = names
+            self.fit_text(self.canvas.width(), self.canvas.height())
+
+        self.ax.set_title(title)
+        self.key = key
+        self.canvas.draw_idle()
+
+    def fit_text(self, width, height):
+        """Dostosowanie rozmiaru czcionki etykiet do wielkości wykresu."""
+        size = max(min(width, height) / 50, 6)
+        for text in self.texts + self.autotexts:
+            text.set_fontsize(size)
+
+    def show_bars(self, frame, colors, title, xlabel):
+        """Skumulowany wykres słupkowy z DataFrame (okres x aktywność).
+
+        Przy tych samych okresach i aktywnościach zmieniane są tylko wysokości słupków.
+        """
+        key = (title, tuple(frame.index), tuple(frame.columns), frame.values.tobytes())
+        if key == self.key:
+            return
+        layout_key = (tuple(frame.index), tuple(frame.columns))
+        # Podstawy słupków dla wszystkich aktywności naraz
+        bottoms = frame.cumsum(axis=1) - frame
+
+        if layout_key == self.layout_key:
+            for activity_name, bars in self.bars.items():
+                for bar, height, bottom in zip(bars, frame[activity_name], bottoms[activity_name]):
+                    bar.set_height(height)
+                    bar.set_y(bottom)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        else:
+            self.ax.clear()
+            self.bars = {}
+            for activity_name in frame.columns:
+                self.bars[activity_name] = self.ax.bar(
+                    frame.index, frame[activity_name], bottom=bottoms[activity_name],
+                    label=activity_name, color=colors.get(activity_name, DEFAULT_COLOR))
+            self.ax.set_xlabel(xlabel)
+            self.ax.set_ylabel("Czas (minuty)")
+            if len(frame.columns):
+                self.ax.legend()
+            self.layout_key = layout_key
+
+        self.ax.set_title(title)
+        self.key = key
+        self.canvas.draw_idle()
+
+
+class StatsView(QWidget):
+    """Okno statystyk z zakładkami: dzień, tydzień, miesiąc, rok."""
+
+    # Zmiana wymiaru (aktywności/grupy) - właściciel okna przelicza wykresy
+    dimension_changed = pyqtSignal(str)
+
+    # Ile wyników obliczeń (zakres dat -> wynik) trzymać w pamięci
+    cache_size = 32
+
+    def __init__(self):
+        super().__init__()
+        self.setGeometry(200, 200, 800, 600)
+        layout = QVBoxLayout(self)
+        dimension_layout = QHBoxLayout()
+        dimension_layout.addWidget(QLabel("Według:"))
+        self.dimension_combo = QComboBox()
+        for _, label in DIMENSION_LABELS:
+            self.dimension_combo.addItem(label)
+        self.dimension_combo.currentIndexChanged.connect(
+            lambda index: self.dimension_changed.emit(DIMENSION_LABELS[index][0]))
+        dimension_layout.addWidget(self.dimension_combo)
+        dimension_layout.addStretch(1)
+        layout.addLayout(dimension_layout)
+        self.tabs = QTabWidget()
+        layout.addWidget(self.tabs)
+
+        self.pie = ChartPanel()
+        self.week = ChartPanel()
+        self.month = ChartPanel()
+        self.year = ChartPanel()
+        self.streaks_label = QLabel()
+        self.streaks_label.setWordWrap(True)
+        self.year.layout().addWidget(self.streaks_label)
+
+        self.tabs.addTab(self.pie, "Wykres kołowy")
+        self.tabs.addTab(self.week, "Wykres tygodniowy")
+        self.tabs.addTab(self.month, "Wykres miesięczny")
+        self.tabs.addTab(self.year, "Wykres roczny")
+
+        self.pie.figure.canvas.mpl_connect('resize_event', self.on_pie_resize)
+        self.results = {}
+
+    def on_pie_resize(self, event):
+        self.pie.fit_text(event.width, event.height)
+        self.pie.figure.tight_layout()
+
+    def dimension(self):
+        return DIMENSION_LABELS[self.dimension_combo.currentIndex()][0]
+
+    def cached(self, key, version, compute):
+        """Wynik compute() dla klucza (np. zakresu dat), liczony ponownie tylko po zmianie danych."""
+        entry = self.results.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        result = compute()
+        self.results.pop(key, None)
+        if len(self.results) >= self.cache_size:
+            del self.results[next(iter(self.results))]
+        self.results[key] = (version, result)
+        return result
+
+    def set_streaks(self, streaks):
+        streaks_text = ", ".join(f"{name}: {longest} (obecnie {current})"
+                                 for name, (longest, current) in streaks.items())
+        self.streaks_label.setText(f"Najdłuższe serie dni: {streaks_text or 'brak'}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Moduły aplikacji leżą bezpośrednio w katalogu zarzadzanie-czasem-vault
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+from day_grid import EMPTY, ActivityTable, DayGrid
+from vault_merge import MergeReport, MergeSource, merge_days
+
+DATE = "2026-10-18"
+
+
+def filled_day(table, cells, name="Praca"):
+    day = DayGrid()
+    for cell in cells:
+        day[cell] = table.index(name)
+    return day
+
+
+def merged(sources, table, policy):
+    return dict(merge_days(sources, table, policy, MergeReport()))[DATE]
+
+
+def test_lww_newer_cleared_day_wins():
+    table = ActivityTable([{"name": "Praca"}])
+    older = MergeSource("stary", {DATE: filled_day(table, range(6))}, times={DATE: "2026-10-17T10:00:00"})
+    newer = MergeSource("nowy", {DATE: DayGrid()}, times={DATE: "2026-10-18T10:00:00"})
+
+    day = merged([newer, older], table, "lww")
+
+    assert all(index == EMPTY for index in day)
+
+
+def test_union_fills_gaps_from_other_sources():
+    table = ActivityTable([{"name": "Praca"}])
+    first = MergeSource("pierwszy", {DATE: DayGrid()})
+    second = MergeSource("drugi", {DATE: filled_day(table, range(6))})
+
+    day = merged([first, second], table, "union")
+
+    assert [day[cell] for cell in range(6)] == [table.index("Praca")] * 6
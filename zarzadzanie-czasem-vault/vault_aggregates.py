@@ -0,0 +1,150 @@
+"""
+Zmaterializowane sumy: minuty na aktywność dla dni, tygodni, miesięcy i lat.
+
+Sumy są aktualizowane przy każdej zmianie komórki, więc statystyki dla
+dowolnego okresu nie wymagają przeglądania komórek z całej historii.
+Plik z sumami zapisywany jest obok danych razem z sygnaturą plików
+danych - jeśli dane zmieniły się poza aplikacją, sumy są przeliczane.
+Z przypisaniem grup (GroupMap) te same sumy prowadzone są też dla grup
+aktywności - w tym samym wywołaniu add(), bez osobnego przebiegu.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import datetime
+import json
+import os
+
+from day_grid import BLOCK_MINUTES
+
+
+def period_keys(date_str):
+    """Klucze tygodnia (ISO), miesiąca i roku dla daty yyyy-MM-dd."""
+    year, week, _ = datetime.date.fromisoformat(date_str).isocalendar()
+    return f"{year}-W{week:02d}", date_str[:7], date_str[:4]
+
+
+def files_signature(file_names):
+    signature = []
+    for file_name in file_names:
+        if os.path.exists(file_name):
+            stat = os.stat(file_name)
+            signature.append([file_name, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def add_minutes(totals, key, name, minutes):
+    bucket = totals.setdefault(key, {})
+    value = bucket.get(name, 0) + minutes
+    if value:
+        bucket[name] = value
+    else:
+        del bucket[name]
+        if not bucket:
+            del totals[key]
+
+
+class AggregateCache:
+    def __init__(self, file_name, table, block_minutes=BLOCK_MINUTES, groups=None):
+        self.file_name = file_name
+        self.table = table
+        self.block_minutes = block_minutes
+        self.groups = groups
+        # Licznik zmian - pozwala innym modułom rozpoznać, że sumy są nieaktualne
+        self.version = 0
+        self.clear()
+
+    def clear(self):
+        self.version += 1
+        self.days = {}
+        self.weeks = {}
+        self.months = {}
+        self.years = {}
+        self.group_days = {}
+        self.group_weeks = {}
+        self.group_months = {}
+        self.group_years = {}
+
+    def add(self, date_str, name, minutes):
+        self.version += 1
+        add_minutes(self.days, date_str, name, minutes)
+        week, month, year = period_keys(date_str)
+        add_minutes(self.weeks, week, name, minutes)
+        add_minutes(self.months, month, name, minutes)
+        add_minutes(self.years, year, name, minutes)
+        if self.groups is not None:
+            group = self.groups.group_of(name)
+            add_minutes(self.group_days, date_str, group, minutes)
+            add_minutes(self.group_weeks, week, group, minutes)
+            add_minutes(self.group_months, month, group, minutes)
+            add_minutes(self.group_years, year, group, minutes)
+
+    def buckets(self, by="activity"):
+        """Sumy (dni, tygodnie, miesiące, lata) według aktywności albo grup ("group")."""
+        if by == "group":
+            return self.group_days, self.group_weeks, self.group_months, self.group_years
+        return self.days, self.weeks, self.months, self.years
+
+    def set_groups(self, groups):
+        """Nowe przypisanie grup - sumy grup liczone z sum aktywności, bez przeglądania dni."""
+        self.groups = groups
+        self.version += 1
+        self.group_days, self.group_weeks, self.group_months, self.group_years = (
+            {key: groups.roll_up(bucket) for key, bucket in buckets.items()} if groups is not None else {}
+            for buckets in self.buckets("activity"))
+
+    def update_day(self, date_str, day):
+        """Podmiana całego dnia - aktualizowane są tylko różnice."""
+        old_minutes = self.days.get(date_str, {})
+        new_minutes = day.minutes(self.table) if day is not None else {}
+        for name in set(old_minutes) | set(new_minutes):
+            delta = new_minutes.get(name, 0) - old_minutes.get(name, 0)
+            if delta:
+                self.add(date_str, name, delta)
+
+    def rebuild(self, days):
+        """Przelicza wszystkie sumy z danych (jeden przebieg po historii)."""
+        self.clear()
+        for date_str, day in days.items():
+            for name, minutes in day.minutes(self.table).items():
+                self.add(date_str, name, minutes)
+
+    def day_totals(self, date_str, by="activity"):
+        return dict(self.buckets(by)[0].get(date_str, {}))
+
+    def month_totals(self, month, by="activity"):
+        """month w formacie yyyy-MM."""
+        return dict(self.buckets(by)[2].get(month, {}))
+
+    def load(self, signature):
+        """Wczytuje sumy z pliku; False, jeśli brak pliku lub dane się zmieniły."""
+        if not os.path.exists(self.file_name):
+            return False
+        try:
+            with open(self.file_name, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if data.get("signature") != signature or data.get("block_minutes") != self.block_minutes:
+            return False
+        self.days = data["days"]
+        self.weeks = data["weeks"]
+        self.months = data["months"]
+        self.years = data["years"]
+        # Sumy grup nie są zapisywane - wynikają z sum aktywności i bieżących grup
+        self.set_groups(self.groups)
+        return True
+
+    def save(self, signature):
+        tmp_file = self.file_name + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump({
+                "signature": signature,
+                "block_minutes": self.block_minutes,
+                "days": self.days,
+                "weeks": self.weeks,
+                "months": self.months,
+                "years": self.years,
+            }, file, ensure_ascii=False)
+        os.replace(tmp_file, self.file_name)
@@ -0,0 +1,133 @@
+"""
+Śledzenie zmian: czas ostatniej modyfikacji każdego dnia i komórki zmienione
+od ostatniego zapisu.
+
+Czasy modyfikacji dni zapisywane są obok pliku danych (<plik>.mtimes), także
+obok plików eksportu - scalanie porównuje wtedy czasy poszczególnych dni
+zamiast jednego updated_at dla całego pliku. Punkty kontrolne (np. ostatni
+eksport do danego pliku) pozwalają przetwarzać tylko dni zmienione od tego
+momentu.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import datetime
+import json
+import os
+
+from vault_index import file_signature
+
+
+def mtimes_file_name(data_file):
+    return data_file + ".mtimes"
+
+
+def now():
+    return datetime.datetime.now().isoformat()
+
+
+def load_day_times(data_file):
+    """Czasy modyfikacji dni zapisane obok pliku danych ({} jeśli brak)."""
+    file_name = mtimes_file_name(data_file)
+    if not os.path.exists(file_name):
+        return {}
+    try:
+        with open(file_name, "r", encoding="utf-8") as file:
+            return json.load(file).get("days", {})
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return {}
+
+
+def save_day_times(data_file, day_times, checkpoints=None):
+    file_name = mtimes_file_name(data_file)
+    tmp_file = file_name + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump({"days": day_times, "checkpoints": checkpoints or {}}, file)
+    os.replace(tmp_file, file_name)
+
+
+class ChangeTracker:
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.day_times = {}    # data -> czas ostatniej zmiany (ISO)
+        self.checkpoints = {}  # nazwa -> {"time": ..., "signature": ...}
+        # Zmiany od ostatniego take_records(): data -> zbiór komórek (None = cały dzień)
+        self.dirty = {}
+
+    def touch_cells(self, date, cells, timestamp=None):
+        """Zakres zmienionych komórek (indeksy wiersz * kolumny + kolumna) jednym wywołaniem."""
+        self.day_times[date] = timestamp or now()
+        dirty = self.dirty.setdefault(date, set())
+        if dirty is not None:
+            dirty.update(cells)
+
+    def touch_day(self, date, timestamp=None):
+        self.day_times[date] = timestamp or now()
+        self.dirty[date] = None
+
+    def day_time(self, date):
+        return self.day_times.get(date)
+
+    def changed_since(self, timestamp):
+        """Daty zmienione po podanym czasie (w kolejności dat)."""
+        return sorted(date for date, time in self.day_times.items() if time > timestamp)
+
+    def mark(self, name, signature=None):
+        """Zapamiętuje punkt kontrolny (np. eksport do pliku o podanej sygnaturze)."""
+        self.checkpoints[name] = {"time": now(), "signature": signature}
+
+    def since(self, name, signature=None):
+        """Daty zmienione od punktu kontrolnego lub None, jeśli punktu brak albo jest nieaktualny."""
+        checkpoint = self.checkpoints.get(name)
+        if checkpoint is None or checkpoint.get("signature") != signature:
+            return None
+        return self.changed_since(checkpoint["time"])
+
+    def take_records(self, days, table):
+        """Zapisy dziennika dla zmian od ostatniego wywołania.
+
+        Każda zmieniona komórka daje jeden zapis z jej bieżącą wartością,
+        więc wielokrotne kliknięcia tej samej komórki nie wydłużają dziennika.
+        """
+        records = []
+        for date, cells in self.dirty.items():
+            if date not in days:
+                records.append([date, {}])
+                continue
+            day = days[date]
+            if cells is None:
+                records.append([date, day.to_squares(table)])
+            else:
+                for cell in sorted(cells):
+                    row, col = divmod(cell, day.cols)
+                    records.append([date, row, col, table.name(day[cell])])
+        self.dirty = {}
+        return records
+
+    def clear_dirty(self):
+        self.dirty = {}
+
+    def reset(self, day_times=None):
+        """Dane podmienione w całości - nowe czasy dni, bez zaległych zmian."""
+        self.day_times = dict(day_times or {})
+        self.dirty = {}
+
+    def load(self):
+        file_name = mtimes_file_name(self.data_file)
+        if not os.path.exists(file_name):
+            return
+        try:
+            with open(file_name, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self.day_times = data.get("days", {})
+            self.checkpoints = data.get("checkpoints", {})
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            print(f"Błąd wczytywania czasów zmian: {str(e)}")
+
+    def save(self):
+        save_day_times(self.data_file, self.day_times, self.checkpoints)
+
+
+def export_signature(file_name):
+    return file_signature(file_name) if os.path.exists(file_name) else None
@@ -0,0 +1,78 @@
+"""
+Model danych aplikacji bez GUI: siatka dnia, zapis i odczyt danych, dziennik
+zmian, baza SQLite, gotowe sumy, grupy aktywności i czasy modyfikacji dni.
+
+Moduł nie importuje PyQt5, matplotlib ani numpy/pandas, więc skrypty, które
+potrzebują tylko danych (raporty, import/eksport, własne analizy), startują
+szybko:
+
+    from vault_core import ActivityTable, open_vault
+    table = ActivityTable()
+    data, close = open_vault("time_management_autosave.json", table)
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import json
+import os
+
+from day_grid import (ROWS, COLS, CELLS, BLOCK_MINUTES, MINUTES_PER_DAY, RESOLUTIONS, EMPTY,
+                      ActivityTable, DayGrid, cells_for, days_matrix)
+from vault_format import format_vault, write_vault_file, read_vault, parse_days
+from vault_journal import JournalStore
+from vault_sqlite import SqliteVault, SqliteDays
+from vault_aggregates import AggregateCache, files_signature
+from vault_changes import ChangeTracker, load_day_times, save_day_times, export_signature
+from vault_groups import GroupMap, UNGROUPED, DIMENSIONS, load_blocks, read_json_lenient
+
+
+def load_activities(file_name):
+    """Wczytuje listę aktywności z pliku activities.json (pomija nieprawidłowe wpisy)."""
+    try:
+        if os.path.exists(file_name):
+            with open(file_name, "r", encoding="utf-8") as file:
+                data = json.load(file)
+                if "activities" in data:  # Sprawdź czy istnieje klucz "activities"
+                    activities = data["activities"]  # Pobierz listę aktywności
+                    valid_activities = []
+                    for activity in activities:
+                        if isinstance(activity, dict) and "name" in activity and "color" in activity:
+                            valid_activities.append(activity)
+                        else:
+                            print(f"Pominięto nieprawidłową aktywność: {activity}")
+                    return valid_activities
+                else:
+                    print("Brak klucza 'activities' w pliku JSON")
+                    return []
+        else:
+            print(f"Nie znaleziono pliku {file_name}")
+            return []
+    except Exception as e:
+        print(f"Błąd wczytywania aktywności: {str(e)}")
+        return []
+
+
+def open_vault(file_name, table):
+    """Zwraca (dane, funkcja zamykająca) dla pliku JSON lub bazy SQLite (.sqlite).
+
+    Dane to słownik z polami created_at/updated_at, rozdzielczością (block_minutes)
+    i dniami w "days". Plik JSON
+    czytany jest razem z dziennikiem zmian, dni wczytywane są leniwie, a obok
+    pliku nic nie jest zapisywane.
+    """
+    if not os.path.exists(file_name):
+        raise FileNotFoundError(f"Nie znaleziono pliku {file_name}")
+    if file_name.endswith(".sqlite"):
+        vault = SqliteVault(file_name, table)
+        data = {"days": SqliteDays(vault), "block_minutes": vault.block_minutes}
+        for key in ("created_at", "updated_at"):
+            if vault.get_meta(key) is not None:
+                data[key] = vault.get_meta(key)
+        return data, vault.close
+    journal = JournalStore(file_name, table)
+    data = journal.load(write_index=False)
+    if data is None or "days" not in data:
+        raise ValueError(f"Nieznany format pliku {file_name}")
+    data.setdefault("block_minutes", BLOCK_MINUTES)
+    return data, journal.close
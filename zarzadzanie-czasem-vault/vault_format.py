@@ -0,0 +1,116 @@
+"""
+Zapis danych w czytelnym formacie pliku autosave.
+
+Dane są wypisywane jednym przebiegiem prosto do pliku, bez budowania
+całego tekstu w pamięci. W pamięci dni są trzymane jako DayGrid, a format
+{"nazwa": [{"row": r, "col": c}, ...]} pojawia się tylko w pliku.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import io
+import json
+import os
+
+from day_grid import BLOCK_MINUTES, DayGrid
+
+
+def quote(text):
+    return json.dumps(text, ensure_ascii=False)
+
+
+def format_day(date, day_data):
+    """Zwraca tekst jednego dnia w formacie pliku autosave."""
+    parts = [f'    {quote(date)}: {{\n']
+    activities_count = len(day_data)
+    for j, (activity_name, squares) in enumerate(day_data.items()):
+        parts.append(f'      {quote(activity_name)}: [\n')
+        parts.append(',\n'.join(
+            f'        {{"row": {square["row"]}, "col": {square["col"]}}}' for square in squares
+        ))
+        if squares:
+            parts.append('\n')
+        parts.append('      ]')
+        if j < activities_count - 1:
+            parts.append(',')
+        parts.append('\n')
+    parts.append('    }')
+    return ''.join(parts)
+
+
+def write_vault(data, file, table):
+    """Zapisuje dane do otwartego pliku w niestandardowym formacie JSON.
+
+    Zwraca indeks dni: data -> (pozycja, długość) tekstu dnia w bajtach UTF-8.
+    """
+    position = 0
+    index = {}
+
+    def write(text):
+        nonlocal position
+        file.write(text)
+        position += len(text.encode("utf-8"))
+
+    write("{\n")
+
+    # Pola created_at i updated_at na początku
+    if "created_at" in data:
+        write(f'  "created_at": {quote(data["created_at"])},\n')
+    if "updated_at" in data:
+        write(f'  "updated_at": {quote(data["updated_at"])},\n')
+    # Rozdzielczość zapisywana tylko, gdy inna niż domyślne 10 minut
+    block_minutes = data.get("block_minutes", BLOCK_MINUTES)
+    if block_minutes != BLOCK_MINUTES:
+        write(f'  "block_minutes": {block_minutes},\n')
+
+    # Sekcja days - każdy dzień zapisywany osobno
+    write('  "days": {\n')
+    first = True
+    for date, day_data in data["days"].items():
+        if not first:
+            write(',\n')
+        start = position
+        write(format_day(date, day_data.to_squares(table)))
+        index[date] = (start, position - start)
+        first = False
+    if not first:
+        write('\n')
+
+    write('  }\n')
+    write('}')
+    return index
+
+
+def write_vault_file(data, file_name, table):
+    """Zapisuje dane do pliku przez plik tymczasowy i os.replace.
+
+    Przerwanie zapisu nie zostawia uciętego pliku - zostaje poprzednia wersja.
+    """
+    tmp_file = file_name + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8", newline="\n") as file:
+        index = write_vault(data, file, table)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_file, file_name)
+    return index
+
+
+def format_vault(data, table):
+    """Zwraca dane jako tekst (dla zgodności ze starszym kodem)."""
+    buffer = io.StringIO()
+    write_vault(data, buffer, table)
+    return buffer.getvalue()
+
+
+def parse_days(raw_days, table, block_minutes=BLOCK_MINUTES):
+    """Zamienia sekcję days z pliku na słownik data -> DayGrid."""
+    return {date: DayGrid.from_squares(day_data, table, block_minutes) for date, day_data in raw_days.items()}
+
+
+def read_vault(file, table):
+    """Wczytuje plik danych; dni w formacie DayGrid (jeśli plik ma sekcję days)."""
+    data = json.load(file)
+    if isinstance(data, dict) and "days" in data:
+        data["days"] = parse_days(data["days"], table, data.get("block_minutes", BLOCK_MINUTES))
+    return data
@@ -0,0 +1,108 @@
+"""
+Grupy aktywności (bloki z bloki.json) jako drugi wymiar statystyk.
+
+Aktywność należy do bloku z bloki.json (nazwa i kolor grupy), gdy blok
+wymienia ją w liście "aktywnosci" albo gdy sama aktywność ma pole "blok"
+z id bloku. Pozostałe aktywności grupowane są według pola "grupa" z
+activities.json (np. "grupa-1") bez zmiany nazwy - numer grupy nie jest
+id bloku. Przypisanie aktywność -> grupa liczone jest raz (przy
+wczytaniu list), a sumy grup powstają w tym samym przebiegu co sumy
+aktywności - AggregateCache dodaje minuty do obu wymiarów naraz, a
+StatsEngine zamienia macierz liczników aktywności na grupy jednym
+mnożeniem macierzy.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import json
+import os
+import re
+
+UNGROUPED = "Bez grupy"
+DEFAULT_COLOR = "#CCCCCC"
+DIMENSIONS = ("activity", "group")
+# Przecinek przed ] lub } (bloki.json ma taki po ostatnim bloku)
+TRAILING_COMMA = re.compile(r",(\s*[\]}])")
+
+
+def read_json_lenient(file_name):
+    """json.load, który akceptuje przecinki po ostatnim elemencie listy/obiektu."""
+    with open(file_name, "r", encoding="utf-8") as file:
+        text = file.read()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(TRAILING_COMMA.sub(r"\1", text))
+
+
+def load_blocks(file_name):
+    """Lista bloków z bloki.json ([] jeśli brak pliku albo błąd)."""
+    if not os.path.exists(file_name):
+        print(f"Nie znaleziono pliku {file_name}")
+        return []
+    try:
+        blocks = read_json_lenient(file_name).get("bloki", [])
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Błąd wczytywania bloków: {str(e)}")
+        return []
+    return [block for block in blocks if isinstance(block, dict) and "id" in block and "nazwa" in block]
+
+
+class GroupMap:
+    """Przypisanie nazwa aktywności -> nazwa grupy oraz kolory grup."""
+
+    def __init__(self, activities=(), blocks=()):
+        blocks_by_id = {block["id"]: block for block in blocks}
+        block_of_activity = {}
+        for block in blocks:
+            for name in block.get("aktywnosci") or ():
+                block_of_activity.setdefault(name, block)
+        self.group_by_activity = {}
+        self.colors = {}
+        self.names = []
+        used_blocks = set()
+        other_groups = []
+        for activity in activities:
+            if isinstance(activity, dict) and "name" in activity:
+                block = block_of_activity.get(activity["name"]) or blocks_by_id.get(activity.get("blok"))
+                if block is not None:
+                    group = block["nazwa"]
+                    used_blocks.add(block["id"])
+                else:
+                    group = activity.get("grupa") or UNGROUPED
+                    other_groups.append((group, activity.get("color")))
+                self.group_by_activity[activity["name"]] = group
+        # Grupy w kolejności bloków, potem grupy spoza bloki.json
+        for block_id in sorted(used_blocks):
+            self.add_group(blocks_by_id[block_id]["nazwa"], blocks_by_id[block_id].get("kolor"))
+        # Grupa spoza bloków dostaje kolor swojej pierwszej aktywności
+        for group, color in other_groups:
+            self.add_group(group, color)
+        self.add_group(UNGROUPED, None)
+
+    def add_group(self, name, color):
+        if name not in self.colors:
+            self.names.append(name)
+            self.colors[name] = color or DEFAULT_COLOR
+
+    def group_of(self, activity_name):
+        return self.group_by_activity.get(activity_name, UNGROUPED)
+
+    def roll_up(self, totals):
+        """Sumy {aktywność: minuty} zamienione na {grupa: minuty}."""
+        groups = {}
+        for name, minutes in totals.items():
+            group = self.group_of(name)
+            groups[group] = groups.get(group, 0) + minutes
+        return groups
+
+    def membership(self, activity_names):
+        """Macierz numpy 0/1 (aktywność x grupa) - sumy grup to counts @ membership."""
+        import numpy as np
+
+        matrix = np.zeros((len(activity_names), len(self.names)), dtype=np.int64)
+        column = {name: i for i, name in enumerate(self.names)}
+        for row, name in enumerate(activity_names):
+            matrix[row, column[self.group_of(name)]] = 1
+        return matrix
@@ -0,0 +1,200 @@
+"""
+Indeks dat w pliku autosave i leniwe wczytywanie dni.
+
+Plik autosave pozostaje jednym plikiem JSON, ale obok niego zapisywany jest
+indeks (data -> pozycja i długość tekstu dnia w bajtach). Przy starcie
+wczytywany jest tylko nagłówek i indeks, a dni są odczytywane z pliku
+dopiero wtedy, gdy ktoś o nie zapyta (LazyDays).
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import json
+import os
+import re
+import threading
+from collections.abc import MutableMapping
+
+from day_grid import BLOCK_MINUTES, DayGrid
+
+DAY_START = re.compile(rb'^    "(\d{4}-\d{2}-\d{2})": \{')
+DAY_END = b"    }"
+DAYS_START = b'  "days": {'
+
+
+def index_file_name(snapshot_file):
+    return snapshot_file + ".index"
+
+
+def file_signature(file_name):
+    stat = os.stat(file_name)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def save_index(snapshot_file, index):
+    """Zapisuje indeks dni razem z sygnaturą pliku, do którego się odnosi."""
+    index_file = index_file_name(snapshot_file)
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump({"signature": file_signature(snapshot_file), "days": index}, file)
+    os.replace(tmp_file, index_file)
+
+
+def load_index(snapshot_file):
+    """Zwraca zapisany indeks lub None, jeśli go brak albo jest nieaktualny."""
+    index_file = index_file_name(snapshot_file)
+    if not os.path.exists(index_file):
+        return None
+    try:
+        with open(index_file, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("signature") != file_signature(snapshot_file):
+        return None
+    return {date: tuple(position) for date, position in data["days"].items()}
+
+
+def build_index(snapshot_file):
+    """Buduje indeks przeglądając plik linia po linii (bez parsowania JSON).
+
+    Zwraca None, jeśli plik nie ma układu zapisywanego przez write_vault.
+    """
+    index = {}
+    position = 0
+    in_days = False
+    date = start = None
+    with open(snapshot_file, "rb") as file:
+        for line in file:
+            stripped = line.rstrip(b"\r\n")
+            if not in_days:
+                in_days = stripped == DAYS_START
+            elif start is None:
+                match = DAY_START.match(stripped)
+                if match:
+                    date = match.group(1).decode("ascii")
+                    start = position
+            if start is not None and stripped.rstrip(b",") == DAY_END:
+                index[date] = (start, position + len(stripped.rstrip(b",")) - start)
+                start = None
+            position += len(line)
+    if not in_days or start is not None:
+        return None
+    return index
+
+
+def read_header(file_name):
+    """Wczytuje pola nagłówka (created_at, updated_at, block_minutes) - bez sekcji days."""
+    lines = []
+    with open(file_name, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.rstrip("\r\n") == DAYS_START.decode():
+                break
+            lines.append(line)
+    return json.loads("".join(lines) + '"days": {}}')
+
+
+class DayReader:
+    """Odczyt fragmentów pliku autosave; plik pozostaje otwarty przez całą sesję."""
+
+    def __init__(self, file_name):
+        self.file = open(file_name, "rb")
+        self.lock = threading.Lock()
+
+    def read_day(self, date, position):
+        offset, length = position
+        with self.lock:
+            self.file.seek(offset)
+            text = self.file.read(length).decode("utf-8")
+        return json.loads("{" + text + "}")[date]
+
+    def close(self):
+        self.file.close()
+
+
+class LazyDays(MutableMapping):
+    """Słownik data -> DayGrid, który wczytuje dni z pliku przy pierwszym dostępie.
+
+    Zapisy z dziennika dla dni jeszcze niewczytanych są trzymane w records
+    i nakładane przy wczytaniu dnia.
+    """
+
+    def __init__(self, table, reader=None, index=None, records=None, loaded=None,
+                 block_minutes=BLOCK_MINUTES):
+        self.table = table
+        self.block_minutes = block_minutes
+        self.reader = reader
+        self.index = index or {}
+        self.records = records if records is not None else {}
+        self.loaded = loaded if loaded is not None else {}
+        self.order = dict.fromkeys(self.index)
+        self.order.update(dict.fromkeys(self.loaded))
+        self.order.update(dict.fromkeys(self.records))
+
+    def read(self, date):
+        """Zwraca dzień z pliku i dziennika, bez zapamiętywania."""
+        if date in self.index:
+            day = DayGrid.from_squares(self.reader.read_day(date, self.index[date]), self.table,
+                                       self.block_minutes)
+        else:
+            day = DayGrid(block_minutes=self.block_minutes)
+        for record in self.records.get(date, ()):
+            apply_record(self.table, day, record)
+        return day
+
+    def __getitem__(self, date):
+        day = self.loaded.get(date)
+        if day is None:
+            if date not in self.order:
+                raise KeyError(date)
+            day = self.read(date)
+            self.loaded[date] = day
+        return day
+
+    def __setitem__(self, date, day):
+        self.loaded[date] = day
+        self.order[date] = None
+
+    def __delitem__(self, date):
+        del self.order[date]
+        self.loaded.pop(date, None)
+        self.index.pop(date, None)
+        self.records.pop(date, None)
+
+    def __contains__(self, date):
+        return date in self.order
+
+    def __iter__(self):
+        return iter(list(self.order))
+
+    def __len__(self):
+        return len(self.order)
+
+    def peek(self, date):
+        """Zwraca dzień bez zapamiętywania go, jeśli nie był jeszcze wczytany."""
+        day = self.loaded.get(date)
+        if day is None:
+            if date not in self.order:
+                raise KeyError(date)
+            day = self.read(date)
+        return day
+
+    def items(self):
+        """Przechodzi po wszystkich dniach bez zapamiętywania niewczytanych."""
+        for date in list(self.order):
+            yield date, self.peek(date)
+
+    def copy(self):
+        """Kopia do zapisu w innym wątku - wspólny plik i indeks, własne wczytane dni."""
+        return LazyDays(self.table, self.reader, dict(self.index), dict(self.records), dict(self.loaded),
+                        self.block_minutes)
+
+
+def apply_record(table, day, record):
+    """Nakłada zapis z dziennika na jeden dzień."""
+    if len(record) == 2:
+        day[:] = DayGrid.from_squares(record[1], table, day.block_minutes)
+    else:
+        _, row, col, activity_name = record
+        day.set(row, col, table.index(activity_name))
@@ -0,0 +1,145 @@
+"""
+Dziennik zmian (append-only) dla pliku autosave.
+
+Zamiast przepisywać cały plik autosave przy każdym zapisie, do pliku
+dziennika dopisywane są tylko zmienione komórki. Co jakiś czas dziennik
+jest scalany (kompaktowany) ze snapshotem - w wątku zapisu (AutosaveWorker).
+
+Format dziennika - jedna tablica JSON na linię:
+    ["2025-03-01", 7, 2, "Praca"]     zmiana komórki (None = wyczyszczona)
+    ["2025-03-01", {"Praca": [...]}]  zastąpienie całego dnia
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import json
+import os
+import sys
+import threading
+
+from day_grid import BLOCK_MINUTES, DayGrid
+from vault_format import read_vault, write_vault_file
+from vault_index import (LazyDays, DayReader, apply_record, build_index, load_index,
+                         read_header, save_index)
+
+
+class JournalStore:
+    def __init__(self, snapshot_file, table, compact_threshold=2000):
+        self.snapshot_file = snapshot_file
+        self.table = table
+        self.journal_file = snapshot_file + ".journal"
+        # Dziennik przenoszony na czas kompaktowania
+        self.rotated_file = self.journal_file + ".old"
+        self.compact_threshold = compact_threshold
+        self.records_count = 0
+        self.lock = threading.Lock()
+        self.reader = None
+
+    def load(self, write_index=True):
+        """Odtwarza dane: snapshot + zapisy z dziennika. Zwraca None, jeśli brak danych.
+
+        Dni ze snapshotu są wczytywane leniwie (LazyDays) na podstawie indeksu dat.
+        write_index=False - zbudowany indeks nie jest zapisywany (tylko odczyt).
+        """
+        # Kolejność ma znaczenie: najpierw dziennik z przerwanego kompaktowania
+        self.records_count = 0
+        records = {}
+        for journal_file in (self.rotated_file, self.journal_file):
+            for record in self.read_records(journal_file):
+                records.setdefault(record[0], []).append(record)
+                self.records_count += 1
+
+        if not os.path.exists(self.snapshot_file):
+            if not records:
+                return None
+            return {"days": LazyDays(self.table, records=records)}
+
+        index = load_index(self.snapshot_file)
+        if index is None:
+            index = build_index(self.snapshot_file)
+            if index is not None and write_index:
+                save_index(self.snapshot_file, index)
+
+        if index is None:
+            # Plik w innym układzie - wczytaj wszystko od razu
+            with open(self.snapshot_file, "r", encoding="utf-8") as file:
+                data = read_vault(file, self.table)
+            if "days" not in data:
+                raise ValueError("Nieznany format pliku autosave")
+            block_minutes = data.get("block_minutes", BLOCK_MINUTES)
+            for date_str, date_records in records.items():
+                day = data["days"].setdefault(date_str, DayGrid(block_minutes=block_minutes))
+                for record in date_records:
+                    apply_record(self.table, day, record)
+            return data
+
+        data = read_header(self.snapshot_file)
+        self.close()
+        self.reader = DayReader(self.snapshot_file)
+        data["days"] = LazyDays(self.table, self.reader, index, records,
+                                block_minutes=data.get("block_minutes", BLOCK_MINUTES))
+        return data
+
+    def read_records(self, journal_file):
+        if not os.path.exists(journal_file):
+            return
+        with open(journal_file, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Urwana ostatnia linia (np. po awarii) - pomijamy
+                    print(f"Pominięto uszkodzony wpis dziennika: {line.strip()}", file=sys.stderr)
+
+    def append(self, records):
+        """Dopisuje zapisy do dziennika. Koszt zależy tylko od liczby zmian."""
+        if not records:
+            return
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self.lock:
+            with open(self.journal_file, "a", encoding="utf-8") as file:
+                file.write(lines)
+                file.flush()
+                os.fsync(file.fileno())
+            self.records_count += len(records)
+
+    def needs_compaction(self):
+        return self.records_count >= self.compact_threshold
+
+    @staticmethod
+    def snapshot(data):
+        """Kopia danych do zapisu w innym wątku."""
+        # Płytka kopia wystarczy - dni są podmieniane, a nie modyfikowane w miejscu
+        snapshot = dict(data)
+        snapshot["days"] = data["days"].copy()
+        return snapshot
+
+    def compact(self, data):
+        """Zapisuje snapshot z danych i usuwa scalony dziennik.
+
+        data nie jest kopiowane - z innego wątku należy przekazać snapshot(data).
+        Błąd zapisu przechodzi do wywołującego, a dziennik zostaje do następnego razu.
+        """
+        with self.lock:
+            # Nowe zapisy trafią do świeżego dziennika
+            if os.path.exists(self.journal_file):
+                if os.path.exists(self.rotated_file):
+                    # Poprzednie kompaktowanie się nie powiodło - dołącz resztę
+                    with open(self.journal_file, "r", encoding="utf-8") as src, \
+                         open(self.rotated_file, "a", encoding="utf-8") as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_file)
+                else:
+                    os.replace(self.journal_file, self.rotated_file)
+            self.records_count = 0
+
+        index = write_vault_file(data, self.snapshot_file, self.table)
+        save_index(self.snapshot_file, index)
+        if os.path.exists(self.rotated_file):
+            os.remove(self.rotated_file)
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
@@ -0,0 +1,245 @@
+"""
+Scalanie kilku plików danych (np. z różnych komputerów) dzień po dniu.
+
+Źródła są czytane równolegle w kolejności dat (heapq.merge), a wynik
+zapisywany do pliku na bieżąco, więc w pamięci jest naraz tylko jeden dzień
+z każdego źródła. Konflikty rozstrzygane są dla pojedynczych komórek:
+    lww   - cały dzień (także puste, wyczyszczone komórki) pochodzi ze
+            źródła, w którym zmieniono go później (czasy dni z pliku
+            .mtimes, a gdy ich brak - pole updated_at),
+    union - wygrywa pierwsze źródło na liście, a puste komórki są
+            uzupełniane z pozostałych źródeł.
+Różnice między źródłami trafiają do raportu. Źródła o różnych
+rozdzielczościach scalane są w najdrobniejszej z nich (bez strat).
+
+    python vault_merge.py wynik.json laptop.json komputer.json
+    python vault_merge.py wynik.json a.json b.json c.json --policy union
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import argparse
+import heapq
+import itertools
+import os
+import sys
+
+from day_grid import BLOCK_MINUTES, EMPTY, ActivityTable, DayGrid
+from vault_changes import load_day_times, save_day_times
+from vault_core import open_vault
+from vault_format import write_vault
+
+POLICIES = ("lww", "union")
+
+
+class MergeSource:
+    """Jedno źródło scalania: dni (data -> DayGrid) i czas ostatniego zapisu.
+
+    times to czasy modyfikacji poszczególnych dni (data -> czas), a dates
+    ogranicza scalanie do podanych dat (None - wszystkie dni źródła).
+    """
+
+    def __init__(self, name, days, updated_at=None, created_at=None, close=None, dates=None,
+                 times=None, block_minutes=BLOCK_MINUTES):
+        self.name = name
+        self.days = days
+        self.block_minutes = block_minutes
+        self.updated_at = updated_at or ""
+        self.created_at = created_at
+        self.dates = dates
+        self.times = times or {}
+        self.close_source = close
+
+    def day_time(self, date):
+        return self.times.get(date) or self.updated_at
+
+    def iter_days(self):
+        """Dni w kolejności dat; niewczytane dni nie są zapamiętywane."""
+        read = getattr(self.days, "peek", self.days.__getitem__)
+        for date in sorted(self.days if self.dates is None else self.dates):
+            if date in self.days:
+                yield date, read(date)
+
+    def close(self):
+        if self.close_source is not None:
+            self.close_source()
+            self.close_source = None
+
+
+def open_source(file_name, table, dates=None):
+    data, close = open_vault(file_name, table)
+    return MergeSource(file_name, data["days"], data.get("updated_at"), data.get("created_at"),
+                       close, dates, load_day_times(file_name), data["block_minutes"])
+
+
+class MergeReport:
+    """Podsumowanie scalania: liczba dni, konflikty komórek i czasy scalonych dni."""
+
+    def __init__(self):
+        self.days = 0
+        self.conflicts = []
+        self.day_times = {}
+
+    def add_conflict(self, date, cell, kept, dropped, block_minutes=BLOCK_MINUTES):
+        row, col = divmod(cell, 60 // block_minutes)
+        self.conflicts.append((date, row, col * block_minutes, kept, dropped))
+
+    def summary(self, limit=5):
+        lines = [f"Scalono dni: {self.days}, konflikty komórek: {len(self.conflicts)}"]
+        for date, hour, minute, kept, dropped in self.conflicts[:limit]:
+            lines.append(f"  {date} {hour:02d}:{minute:02d} - {kept or 'puste'} (zamiast {dropped})")
+        if len(self.conflicts) > limit:
+            lines.append(f"  ... i {len(self.conflicts) - limit} więcej")
+        return "\n".join(lines)
+
+
+def ranked_sources(sources, policy):
+    """Źródła od najniższego do najwyższego priorytetu (późniejsze nadpisują wcześniejsze)."""
+    if policy not in POLICIES:
+        raise ValueError(f"Nieznany tryb scalania: {policy}")
+    return list(sources) if policy == "lww" else list(reversed(sources))
+
+
+def merge_resolution(sources):
+    """Rozdzielczość wyniku: najdrobniejsza ze źródeł."""
+    return min((source.block_minutes for source in sources), default=BLOCK_MINUTES)
+
+
+def tagged_days(source, rank, block_minutes):
+    resample = None
+    if source.block_minutes != block_minutes:
+        from vault_resample import resample_day
+        resample = resample_day
+    for date, day in source.iter_days():
+        if resample is not None:
+            day = resample(day, block_minutes)
+        yield date, rank, source.day_time(date), day
+
+
+def merge_day(date, days, table, report, policy="lww"):
+    """Scala dni (od najniższego priorytetu) komórka po komórce.
+
+    lww - wynikiem jest ostatni (najnowszy) dzień w całości, także z pustymi
+    komórkami; union - puste komórki uzupełniane z dni o niższym priorytecie.
+    """
+    if len(days) == 1:
+        return DayGrid(days[0])
+    if policy == "lww":
+        merged = DayGrid(days[-1])
+        block_minutes = merged.block_minutes
+        # Raport: komórki starszych dni nadpisane (także wyczyszczone) przez najnowszy dzień
+        for day in days[:-1]:
+            for cell, index in enumerate(day):
+                if index != EMPTY and index != merged[cell]:
+                    report.add_conflict(date, cell, table.name(merged[cell]), table.name(index), block_minutes)
+        return merged
+    merged = DayGrid(bytes(len(days[0])))
+    block_minutes = merged.block_minutes
+    for day in days:
+        for cell, index in enumerate(day):
+            if index == EMPTY:
+                continue
+            current = merged[cell]
+            if current != EMPTY and current != index:
+                report.add_conflict(date, cell, table.name(index), table.name(current), block_minutes)
+            merged[cell] = index
+    return merged
+
+
+def merge_days(sources, table, policy="lww", report=None, block_minutes=None):
+    """Generator (data, DayGrid) scalonych dni w kolejności dat.
+
+    block_minutes to rozdzielczość wyniku (domyślnie najdrobniejsza ze źródeł).
+    """
+    if report is None:
+        report = MergeReport()
+    ranked = ranked_sources(sources, policy)
+    if block_minutes is None:
+        block_minutes = merge_resolution(ranked)
+    streams = [tagged_days(source, rank, block_minutes) for rank, source in enumerate(ranked)]
+    for date, group in itertools.groupby(heapq.merge(*streams), key=lambda item: item[0]):
+        group = list(group)
+        if policy == "lww":
+            # Sortowanie jest stabilne - przy równych czasach wygrywa późniejsze na liście
+            group.sort(key=lambda item: item[2])
+        times = [time for _, _, time, _ in group if time]
+        if times:
+            report.day_times[date] = max(times)
+        report.days += 1
+        yield date, merge_day(date, [day for _, _, _, day in group], table, report, policy)
+
+
+class MergedDays:
+    """Widok scalonych dni dla write_vault (tylko items(), bez trzymania całości)."""
+
+    def __init__(self, sources, table, policy, report):
+        self.sources = sources
+        self.table = table
+        self.policy = policy
+        self.report = report
+
+    def items(self):
+        return merge_days(self.sources, self.table, self.policy, self.report)
+
+
+def merge_to_file(sources, file_name, table, policy="lww"):
+    """Zapisuje scalone źródła do pliku (przez plik tymczasowy). Zwraca MergeReport.
+
+    Źródła są zamykane przed podmianą pliku, więc plik wynikowy może być też źródłem.
+    """
+    report = MergeReport()
+    created = [source.created_at for source in sources if source.created_at]
+    updated = [source.updated_at for source in sources if source.updated_at]
+    data = {"days": MergedDays(sources, table, policy, report), "block_minutes": merge_resolution(sources)}
+    if created:
+        data["created_at"] = min(created)
+    if updated:
+        data["updated_at"] = max(updated)
+
+    tmp_file = file_name + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8", newline="\n") as file:
+            write_vault(data, file, table)
+            file.flush()
+            os.fsync(file.fileno())
+    finally:
+        for source in sources:
+            source.close()
+    os.replace(tmp_file, file_name)
+    if report.day_times:
+        save_day_times(file_name, report.day_times)
+    return report
+
+
+def merge_files(input_files, output_file, table, policy="lww"):
+    sources = []
+    try:
+        for file_name in input_files:
+            sources.append(open_source(file_name, table))
+    except Exception:
+        for source in sources:
+            source.close()
+        raise
+    return merge_to_file(sources, output_file, table, policy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scalanie plików danych dzień po dniu.")
+    parser.add_argument("output", help="plik wynikowy")
+    parser.add_argument("inputs", nargs="+", help="pliki do scalenia (JSON lub .sqlite)")
+    parser.add_argument("--policy", choices=POLICIES, default="lww")
+    parser.add_argument("--conflicts", type=int, default=20, help="ile konfliktów wypisać")
+    args = parser.parse_args(argv)
+
+    try:
+        report = merge_files(args.inputs, args.output, ActivityTable(), args.policy)
+    except (OSError, ValueError) as e:
+        print(f"Błąd scalania: {str(e)}", file=sys.stderr)
+        return 1
+    print(report.summary(args.conflicts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Raporty aktywności z linii poleceń - bez PyQt5 i bez ekranu (np. z crona).
+
+Czyta plik autosave (razem z dziennikiem zmian), dowolny zapisany plik
+danych albo bazę SQLite i zapisuje sumy minut na aktywność dla dni,
+tygodni lub miesięcy jako CSV, JSON albo wykres PNG - według aktywności
+albo grup aktywności (bloki z bloki.json). Dni są czytane z pliku po
+kolei, więc pamięć nie rośnie z długością historii.
+
+    python vault_report.py time_management_autosave.json --period week
+    python vault_report.py dane.json --period month --format png -o miesiace.png
+    python vault_report.py time_management.sqlite --start 2025-01-01 --end 2025-03-31 --format json
+    python vault_report.py time_management_autosave.json --period month --by group
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from vault_core import (ActivityTable, AggregateCache, GroupMap, DIMENSIONS, load_activities,
+                        load_blocks, open_vault)
+
+PERIODS = ("day", "week", "month")
+FORMATS = ("csv", "json", "png")
+DEFAULT_COLOR = "#CCCCCC"
+
+
+def collect_totals(days, table, start=None, end=None, groups=None):
+    """Jeden przebieg po historii - sumy dla dni, tygodni i miesięcy (oraz grup) naraz."""
+    totals = AggregateCache(None, table, groups=groups)
+    for date_str, day in days.items():
+        if (start and date_str < start) or (end and date_str > end):
+            continue
+        for name, minutes in day.minutes(table).items():
+            totals.add(date_str, name, minutes)
+    return totals
+
+
+def period_totals(totals, period, by="activity"):
+    buckets = totals.buckets(by)[PERIODS.index(period)]
+    return {key: buckets[key] for key in sorted(buckets)}
+
+
+def load_activity_list(activities_file):
+    if not activities_file or not os.path.exists(activities_file):
+        return []
+    return load_activities(activities_file)
+
+
+def load_colors(activities_file):
+    """Kolory aktywności z activities.json (jeśli plik istnieje)."""
+    return {activity["name"]: activity["color"] for activity in load_activity_list(activities_file)}
+
+
+def write_csv(report, file, period, by="activity"):
+    writer = csv.writer(file, lineterminator="\n")
+    writer.writerow([period, by, "minutes"])
+    for key, bucket in report.items():
+        for name, minutes in bucket.items():
+            writer.writerow([key, name, minutes])
+
+
+def write_json(report, file, period, by="activity"):
+    json.dump({"period": period, "by": by, "totals": report}, file, ensure_ascii=False, indent=2)
+    file.write("\n")
+
+
+def write_png(report, file_name, period, colors):
+    # Figure + FigureCanvasAgg - bez pyplot i bez backendu okienkowego
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    names = list(dict.fromkeys(name for bucket in report.values() for name in bucket))
+    keys = list(report)
+    figure = Figure(figsize=(max(8, len(keys) * 0.25), 6))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    bottom = [0] * len(keys)
+    for name in names:
+        minutes = [report[key].get(name, 0) for key in keys]
+        ax.bar(keys, minutes, bottom=bottom, label=name, color=colors.get(name, DEFAULT_COLOR))
+        bottom = [bottom[i] + minutes[i] for i in range(len(keys))]
+    ax.set_title(f"Aktywności ({period})")
+    ax.set_ylabel("Czas (minuty)")
+    ax.tick_params(axis="x", labelrotation=90)
+    if names:
+        ax.legend(fontsize="small")
+    figure.tight_layout()
+    figure.savefig(file_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Raporty aktywności z pliku danych (bez GUI).")
+    parser.add_argument("vault", help="plik autosave / zapisany plik JSON albo baza .sqlite")
+    parser.add_argument("--period", choices=PERIODS, default="day")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", help="plik wynikowy (domyślnie standardowe wyjście)")
+    parser.add_argument("--start", help="pierwszy dzień raportu (yyyy-MM-dd)")
+    parser.add_argument("--end", help="ostatni dzień raportu (yyyy-MM-dd)")
+    parser.add_argument("--by", choices=DIMENSIONS, default="activity",
+                        help="sumy według aktywności albo grup (bloki)")
+    parser.add_argument("--activities", default="activities.json", help="kolory i grupy aktywności")
+    parser.add_argument("--blocks", default="bloki.json", help="nazwy i kolory grup (bloki)")
+    args = parser.parse_args(argv)
+
+    if args.format == "png" and not args.output:
+        parser.error("format png wymaga --output")
+
+    table = ActivityTable()
+    activities = load_activity_list(args.activities)
+    groups = None
+    if args.by == "group":
+        groups = GroupMap(activities, load_blocks(args.blocks))
+    try:
+        data, close = open_vault(args.vault, table)
+    except (OSError, ValueError) as e:
+        print(f"Błąd wczytywania danych: {str(e)}", file=sys.stderr)
+        return 1
+    try:
+        totals = collect_totals(data["days"], table, args.start, args.end, groups)
+    finally:
+        close()
+    report = period_totals(totals, args.period, args.by)
+
+    if args.format == "png":
+        if groups is not None:
+            colors = groups.colors
+        else:
+            colors = {activity["name"]: activity["color"] for activity in activities}
+        write_png(report, args.output, args.period, colors)
+        return 0
+    writer = write_csv if args.format == "csv" else write_json
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            writer(report, file, args.period, args.by)
+    else:
+        writer(report, sys.stdout, args.period, args.by)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Zmiana rozdzielczości siatki (5/10/15/30 minut na blok) dla całej historii.
+
+Dni są składane w macierz (dni x bloki) i przeliczane wektorowo przez
+wspólną jednostkę 5 minut:
+    - na drobniejszą rozdzielczość każdy blok jest powielany - bez strat,
+    - na grubszą każdy nowy blok dostaje aktywność z największym
+      niedoborem (minuty w danych minus minuty już przydzielone do tego
+      miejsca dnia). Suma dnia zgadza się dokładnie, a czas każdej
+      aktywności w dniu różni się od oryginału o mniej niż jeden nowy blok
+      (liczba bloków każdej aktywności ustalana metodą największych reszt).
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import numpy as np
+
+from day_grid import MINUTES_PER_DAY, DayGrid, cells_for, days_matrix
+
+UNIT_MINUTES = 5  # wspólna jednostka wszystkich rozdzielczości
+
+
+def refine(matrix, factor):
+    """Każdy blok powielony factor razy (dokładna zmiana na drobniejszą rozdzielczość)."""
+    return np.repeat(matrix, factor, axis=1)
+
+
+def coarsen(matrix, factor):
+    """Łączy po factor bloków w jeden, zachowując sumy aktywności w dniu (z dokładnością do bloku)."""
+    days, cells = matrix.shape
+    blocks = cells // factor
+    if not days:
+        return np.zeros((0, blocks), dtype=np.uint8)
+    # Tylko aktywności występujące w danych - tablica liczników pozostaje mała
+    values = np.flatnonzero(np.bincount(matrix.ravel(), minlength=256)).astype(np.uint8)
+    lookup = np.zeros(256, dtype=np.int64)
+    lookup[values] = np.arange(len(values))
+    codes = lookup[matrix]
+    kinds = len(values)
+    slots = np.repeat(np.arange(days * blocks), factor)
+    counts = np.bincount(slots * kinds + codes.ravel(),
+                         minlength=days * blocks * kinds).reshape(days, blocks, kinds)
+
+    # Liczba nowych bloków każdej aktywności w dniu: metoda największych reszt
+    units = counts.sum(axis=1)
+    quota = units // factor
+    missing = blocks - quota.sum(axis=1)
+    order = np.argsort(-(units % factor), axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(kinds)[None, :], axis=1)
+    quota += rank < missing[:, None]
+
+    rows = np.arange(days)
+    needed = np.zeros((days, kinds), dtype=np.int64)    # jednostki z danych do tej pory
+    assigned = np.zeros((days, kinds), dtype=np.int64)  # jednostki już przydzielone
+    result = np.empty((days, blocks), dtype=np.uint8)
+    # Pętla tylko po blokach doby (najwyżej 96) - dni i aktywności liczone wektorowo
+    for block in range(blocks):
+        needed += counts[:, block]
+        deficit = np.where(quota > 0, needed - assigned, np.iinfo(np.int64).min)
+        choice = np.argmax(deficit, axis=1)
+        assigned[rows, choice] += factor
+        quota[rows, choice] -= 1
+        result[:, block] = values[choice]
+    return result
+
+
+def resample_matrix(matrix, from_minutes, to_minutes):
+    """Macierz (dni x bloki) w rozdzielczości from_minutes przeliczona na to_minutes."""
+    if matrix.shape[1] != cells_for(from_minutes):
+        raise ValueError(f"Macierz nie pasuje do rozdzielczości {from_minutes} min")
+    cells_for(to_minutes)
+    if from_minutes == to_minutes:
+        return matrix.copy()
+    units = refine(matrix, from_minutes // UNIT_MINUTES)
+    if to_minutes == UNIT_MINUTES:
+        return units
+    return coarsen(units, to_minutes // UNIT_MINUTES)
+
+
+def resample_day(day, to_minutes):
+    """Pojedynczy DayGrid w innej rozdzielczości."""
+    if day.block_minutes == to_minutes:
+        return DayGrid(day)
+    matrix = np.frombuffer(bytes(day), dtype=np.uint8).reshape(1, len(day))
+    return DayGrid(resample_matrix(matrix, day.block_minutes, to_minutes).tobytes())
+
+
+def resample_days(days, from_minutes, to_minutes):
+    """Słownik data -> DayGrid w nowej rozdzielczości dla całej historii."""
+    dates, matrix = days_matrix(days, None, from_minutes)
+    resampled = resample_matrix(matrix, from_minutes, to_minutes)
+    cells = MINUTES_PER_DAY // to_minutes
+    buffer = resampled.tobytes()
+    return {date: DayGrid(buffer[i * cells:(i + 1) * cells]) for i, date in enumerate(dates)}
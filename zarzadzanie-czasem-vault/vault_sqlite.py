@@ -0,0 +1,223 @@
+"""
+Alternatywny magazyn danych: lokalna baza SQLite.
+
+Każdy zajęty blok czasu to jeden wiersz w tabeli entries (data, wiersz,
+kolumna, aktywność) z indeksami po dacie i aktywności, więc wczytanie
+i zapis dnia to jedno zapytanie zamiast przepisywania całego pliku.
+Tabela days zawiera wszystkie zapisane dni - także puste (wyczyszczone),
+więc import i eksport zachowują te same dni co plik JSON.
+
+Import/eksport formatu time_management_autosave.json:
+    python vault_sqlite.py import time_management_autosave.json time_management.sqlite
+    python vault_sqlite.py export time_management.sqlite kopia.json
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import datetime
+import sqlite3
+import sys
+from collections.abc import MutableMapping
+
+from day_grid import BLOCK_MINUTES, EMPTY, ActivityTable, DayGrid
+from vault_format import read_vault, write_vault_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entries (
+    date TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    activity_id INTEGER NOT NULL REFERENCES activities(id),
+    PRIMARY KEY (date, row, col)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_activity ON entries (activity_id, date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SqliteVault:
+    def __init__(self, db_file, table):
+        self.db_file = db_file
+        self.table = table
+        self.connection = sqlite3.connect(db_file)
+        has_days = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'days'").fetchone()
+        self.connection.executescript(SCHEMA)
+        if not has_days:
+            # Starsze bazy nie mają tabeli days - dni z wpisów (pustych dni już w nich nie ma)
+            self.connection.execute("INSERT OR IGNORE INTO days (date) SELECT DISTINCT date FROM entries")
+            self.commit()
+        self.activity_ids = {}
+        for activity_id, name in self.connection.execute("SELECT id, name FROM activities"):
+            self.activity_ids[name] = activity_id
+            table.index(name)
+        # Rozdzielczość wpisów (minut na blok); starsze bazy nie mają jej w meta
+        self.block_minutes = int(self.get_meta("block_minutes") or BLOCK_MINUTES)
+
+    def activity_id(self, name):
+        activity_id = self.activity_ids.get(name)
+        if activity_id is None:
+            cursor = self.connection.execute("INSERT INTO activities (name) VALUES (?)", (name,))
+            activity_id = cursor.lastrowid
+            self.activity_ids[name] = activity_id
+        return activity_id
+
+    def get_meta(self, key):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def is_empty(self):
+        return self.connection.execute("SELECT 1 FROM days LIMIT 1").fetchone() is None
+
+    def load_day(self, date):
+        """Zwraca DayGrid dla daty lub None, jeśli dnia nie ma w bazie."""
+        rows = self.connection.execute(
+            "SELECT e.row, e.col, a.name FROM entries e JOIN activities a ON a.id = e.activity_id "
+            "WHERE e.date = ?", (date,)).fetchall()
+        if not rows and not self.has_day(date):
+            return None
+        day = DayGrid(block_minutes=self.block_minutes)
+        for row, col, name in rows:
+            day.set(row, col, self.table.index(name))
+        return day
+
+    def save_day(self, date, day):
+        """Zastępuje wpisy dnia (bez commit - zatwierdza commit())."""
+        self.connection.execute("DELETE FROM entries WHERE date = ?", (date,))
+        self.connection.execute("INSERT OR IGNORE INTO days (date) VALUES (?)", (date,))
+        self.connection.executemany(
+            "INSERT INTO entries (date, row, col, activity_id) VALUES (?, ?, ?, ?)",
+            [(date, *divmod(cell, day.cols), self.activity_id(self.table.name(index)))
+             for cell, index in enumerate(day) if index != EMPTY])
+
+    def delete_day(self, date):
+        self.connection.execute("DELETE FROM entries WHERE date = ?", (date,))
+        self.connection.execute("DELETE FROM days WHERE date = ?", (date,))
+
+    def has_day(self, date):
+        return self.connection.execute(
+            "SELECT 1 FROM days WHERE date = ?", (date,)).fetchone() is not None
+
+    def dates(self):
+        return [row[0] for row in self.connection.execute("SELECT date FROM days ORDER BY date")]
+
+    def iter_days(self):
+        """Wszystkie dni w kolejności dat - jedno zapytanie, bez trzymania całości w pamięci."""
+        cursor = self.connection.execute(
+            "SELECT d.date, e.row, e.col, a.name FROM days d "
+            "LEFT JOIN entries e ON e.date = d.date "
+            "LEFT JOIN activities a ON a.id = e.activity_id ORDER BY d.date")
+        date = day = None
+        for entry_date, row, col, name in cursor:
+            if entry_date != date:
+                if day is not None:
+                    yield date, day
+                date, day = entry_date, DayGrid(block_minutes=self.block_minutes)
+            # Pusty dzień - jeden wiersz bez wpisu
+            if name is not None:
+                day.set(row, col, self.table.index(name))
+        if day is not None:
+            yield date, day
+
+    def import_data(self, data, replace=False):
+        """Wczytuje dane w formacie aplikacji (dni jako DayGrid) do bazy."""
+        block_minutes = data.get("block_minutes", BLOCK_MINUTES)
+        if replace:
+            self.connection.execute("DELETE FROM entries")
+            self.connection.execute("DELETE FROM days")
+        elif block_minutes != self.block_minutes and not self.is_empty():
+            raise ValueError(f"Rozdzielczość danych ({block_minutes} min) różni się od bazy "
+                             f"({self.block_minutes} min)")
+        self.block_minutes = block_minutes
+        self.set_meta("block_minutes", str(block_minutes))
+        for date, day in data["days"].items():
+            self.save_day(date, day)
+        for key in ("created_at", "updated_at"):
+            if key in data:
+                self.set_meta(key, data[key])
+        self.commit()
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class SqliteDays(MutableMapping):
+    """Słownik data -> DayGrid oparty na bazie SQLite (zapis przy przypisaniu)."""
+
+    def __init__(self, vault):
+        self.vault = vault
+
+    def __getitem__(self, date):
+        day = self.vault.load_day(date)
+        if day is None:
+            raise KeyError(date)
+        return day
+
+    def __setitem__(self, date, day):
+        self.vault.save_day(date, day)
+
+    def __delitem__(self, date):
+        self.vault.delete_day(date)
+
+    def __contains__(self, date):
+        return self.vault.has_day(date)
+
+    def __iter__(self):
+        return iter(self.vault.dates())
+
+    def __len__(self):
+        return len(self.vault.dates())
+
+    def items(self):
+        return self.vault.iter_days()
+
+
+def import_json(json_file, db_file):
+    table = ActivityTable()
+    with open(json_file, "r", encoding="utf-8") as file:
+        data = read_vault(file, table)
+    vault = SqliteVault(db_file, table)
+    vault.import_data(data, replace=True)
+    vault.close()
+    print(f"Zaimportowano {len(data['days'])} dni z {json_file} do {db_file}")
+
+
+def export_json(db_file, json_file):
+    table = ActivityTable()
+    vault = SqliteVault(db_file, table)
+    data = {
+        "created_at": vault.get_meta("created_at") or datetime.datetime.now().isoformat(),
+        "updated_at": vault.get_meta("updated_at") or datetime.datetime.now().isoformat(),
+        "block_minutes": vault.block_minutes,
+        "days": SqliteDays(vault),
+    }
+    write_vault_file(data, json_file, table)
+    vault.close()
+    print(f"Wyeksportowano dane z {db_file} do {json_file}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "import":
+        import_json(sys.argv[2], sys.argv[3])
+    else:
+        export_json(sys.argv[2], sys.argv[3])
@@ -0,0 +1,185 @@
+"""
+Statystyki dla dowolnego zakresu dat liczone wektorowo (NumPy/pandas).
+
+Dni z zakresu są składane w macierz uint8 (dni x bloki) przez days_matrix,
+a wszystkie sumy, serie i rozkłady godzinowe liczone są na tej macierzy
+bez pętli po komórkach w Pythonie.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import numpy as np
+import pandas as pd
+
+from day_grid import ROWS, BLOCK_MINUTES, days_matrix
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+
+def date_range(start, end):
+    """Lista dat yyyy-MM-dd od start do end (włącznie)."""
+    return list(pd.date_range(start, end, freq="D").strftime("%Y-%m-%d"))
+
+
+def totals_frame(totals):
+    """DataFrame (okres x aktywność) z gotowych sum {okres: {nazwa: minuty}}."""
+    frame = pd.DataFrame.from_dict(totals, orient="index").fillna(0)
+    return frame.astype(int) if len(frame.columns) else frame
+
+
+def daily_frame(day_totals, start=None, end=None):
+    """DataFrame (dzień x aktywność) minut z gotowych sum dziennych {data: {nazwa: minuty}}.
+
+    Indeks zawiera wszystkie dni zakresu (także puste) - bez zakresu od
+    pierwszego do ostatniego dnia w sumach.
+    """
+    dates = [date for date in day_totals
+             if (start is None or date >= start) and (end is None or date <= end)]
+    frame = totals_frame({date: day_totals[date] for date in dates})
+    if start is None or end is None:
+        if not dates:
+            return frame
+        start, end = start or min(dates), end or max(dates)
+    frame.index = pd.to_datetime(frame.index)
+    return frame.reindex(pd.date_range(start, end, freq="D"), fill_value=0)
+
+
+def periods_frame(totals, names):
+    """DataFrame (okres x kolumna) z gotowych sum {okres: {nazwa: minuty}}.
+
+    Zawiera wszystkie okresy (także puste), a kolumny w kolejności names
+    (aktywności z tabeli albo grupy) - tylko te, które wystąpiły.
+    """
+    frame = totals_frame(totals).reindex(index=list(totals), fill_value=0)
+    return frame[[name for name in names if name in frame.columns]]
+
+
+def streak_lengths(active, names):
+    """Najdłuższa i bieżąca seria dni z macierzy bool (dni x kolumny): {nazwa: (najdłuższa, bieżąca)}."""
+    if not len(active):
+        return {}
+    position = np.arange(1, len(active) + 1)[:, None]
+    # Numer ostatniego dnia bez aktywności (do danego dnia włącznie)
+    last_break = np.maximum.accumulate(np.where(active, 0, position), axis=0)
+    run = position - last_break
+    longest = run.max(axis=0)
+    current = run[-1]
+    return {name: (int(longest[i]), int(current[i]))
+            for i, name in enumerate(names) if longest[i] > 0}
+
+
+def daily_streaks(day_totals, start, end, names):
+    """Serie dni z gotowych sum dziennych - bez przeglądania komórek dni."""
+    frame = periods_frame({date: day_totals.get(date, {}) for date in date_range(start, end)}, names)
+    return streak_lengths(frame.to_numpy() > 0, frame.columns)
+
+
+def calendar_grid(dates, values):
+    """Siatka kalendarza dla dat z wartościami (jedna operacja numpy, bez pętli po dniach).
+
+    Każdy rok to 7 wierszy (Pn-Nd) i wiersz odstępu, kolumny to tygodnie
+    (54 - tydzień z 1 stycznia to kolumna 0). Zwraca (wartości, daty, lata):
+    pola poza dniami to NaN/NaT.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    years = dates.astype("datetime64[Y]")
+    first_year = years.min()
+    year_count = int((years.max() - first_year).astype(int)) + 1
+    jan1 = years.astype("datetime64[D]")
+    # 1970-01-01 to czwartek - dzień tygodnia od poniedziałku (0) do niedzieli (6)
+    weekday = (dates.astype(np.int64) + 3) % 7
+    jan1_weekday = (jan1.astype(np.int64) + 3) % 7
+    col = ((dates - jan1).astype(np.int64) + jan1_weekday) // 7
+    row = (years - first_year).astype(np.int64) * 8 + weekday
+
+    shape = (year_count * 8 - 1, 54)
+    grid = np.full(shape, np.nan)
+    grid[row, col] = values
+    date_grid = np.full(shape, np.datetime64("NaT"), dtype="datetime64[D]")
+    date_grid[row, col] = dates
+    labels = [str(first_year.astype(int) + 1970 + i) for i in range(year_count)]
+    return grid, date_grid, labels
+
+
+class StatsEngine:
+    """Statystyki z dni; z przypisaniem grup (GroupMap) także według grup aktywności."""
+
+    def __init__(self, days, table, block_minutes=BLOCK_MINUTES, groups=None):
+        self.days = days
+        self.table = table
+        self.block_minutes = block_minutes
+        self.groups = groups
+
+    def counts(self, start, end):
+        """Macierz liczby bloków (dni x aktywności) dla zakresu dat."""
+        dates, matrix = days_matrix(self.days, date_range(start, end), self.block_minutes)
+        activities = len(self.table)
+        day_index = np.repeat(np.arange(len(dates)), matrix.shape[1])
+        counts = np.bincount(day_index * activities + matrix.ravel(),
+                             minlength=len(dates) * activities)
+        # Kolumna 0 to puste pola
+        return dates, counts.reshape(len(dates), activities)[:, 1:]
+
+    def activity_names(self):
+        return self.table.names[1:]
+
+    def by_dimension(self, counts, by="activity"):
+        """Liczniki aktywności (x aktywności) jako (liczniki, nazwy kolumn) dla wymiaru.
+
+        Grupy to jedno mnożenie przez macierz przynależności - bez ponownego
+        przeglądania komórek.
+        """
+        if by == "activity":
+            return counts, self.activity_names()
+        if by != "group" or self.groups is None:
+            raise ValueError(f"Nieznany wymiar: {by}")
+        return counts @ self.groups.membership(self.activity_names()), self.groups.names
+
+    def period_frame(self, dates, counts, names, granularity):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Nieznana ziarnistość: {granularity}")
+        frame = pd.DataFrame(counts * self.block_minutes, index=pd.to_datetime(dates), columns=names)
+        if granularity == "day":
+            labels = frame.index.strftime("%Y-%m-%d")
+        elif granularity == "week":
+            iso = frame.index.isocalendar()
+            labels = iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+        elif granularity == "month":
+            labels = frame.index.strftime("%Y-%m")
+        else:
+            labels = frame.index.strftime("%Y")
+        result = frame.groupby(np.asarray(labels), sort=True).sum()
+        # Tylko kolumny, które wystąpiły w zakresie
+        return result.loc[:, result.sum(axis=0) > 0]
+
+    def totals(self, start, end, granularity="day", by="activity"):
+        """Minuty w okresach (day/week/month/year) - DataFrame okres x aktywność (lub grupa)."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Nieznana ziarnistość: {granularity}")
+        dates, counts = self.counts(start, end)
+        return self.period_frame(dates, *self.by_dimension(counts, by), granularity)
+
+    def rollups(self, start, end, granularity="day", dimensions=("activity", "group")):
+        """Sumy dla kilku wymiarów naraz {wymiar: DataFrame} - jeden przebieg po dniach."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Nieznana ziarnistość: {granularity}")
+        dates, counts = self.counts(start, end)
+        return {by: self.period_frame(dates, *self.by_dimension(counts, by), granularity)
+                for by in dimensions}
+
+    def streaks(self, start, end, by="activity"):
+        """Najdłuższa i bieżąca seria dni z daną aktywnością: {nazwa: (najdłuższa, bieżąca)}."""
+        _, counts = self.counts(start, end)
+        counts, names = self.by_dimension(counts, by)
+        return streak_lengths(counts > 0, names)
+
+    def hour_distribution(self, start, end, by="activity"):
+        """Minuty na aktywność (lub grupę) w każdej godzinie doby (DataFrame godzina x kolumna)."""
+        _, matrix = days_matrix(self.days, date_range(start, end), self.block_minutes)
+        activities = len(self.table)
+        hours = np.tile(np.repeat(np.arange(ROWS), matrix.shape[1] // ROWS), len(matrix))
+        counts = np.bincount(hours * activities + matrix.ravel(), minlength=ROWS * activities)
+        counts, names = self.by_dimension(counts.reshape(ROWS, activities)[:, 1:], by)
+        frame = pd.DataFrame(counts * self.block_minutes, index=range(ROWS), columns=names)
+        return frame.loc[:, frame.sum(axis=0) > 0]
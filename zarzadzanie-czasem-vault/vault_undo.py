@@ -0,0 +1,121 @@
+"""
+Historia zmian siatki do cofania i ponawiania (Ctrl+Z / Ctrl+Y).
+
+Każda edycja to jedna zwarta operacja: data, pierwsza komórka oraz bajty
+przed i po zmianie dla ciągłego zakresu komórek (kliknięcie - 1 bajt,
+malowanie zakresu - kilkanaście, wyczyszczenie dnia - 144). Ostatnie
+operacje są w pamięci, a starsze zrzucane paczkami do pliku tymczasowego,
+więc historia jest nieograniczona, a zużycie pamięci stałe.
+
+Cofnięcie i ponowienie zapisują komórki tą samą drogą co zwykła edycja,
+więc trafiają do dziennika autosave jak każda inna zmiana.
+
+Created on 2026-10-18
+
+@author: marek
+"""
+import json
+import tempfile
+from collections import namedtuple
+
+EditOperation = namedtuple("EditOperation", "date start old new")
+
+
+def encode(operation):
+    return [operation.date, operation.start, operation.old.hex(), operation.new.hex()]
+
+
+def decode(item):
+    date, start, old, new = item
+    return EditOperation(date, start, bytes.fromhex(old), bytes.fromhex(new))
+
+
+class SpillStack:
+    """Stos operacji: ostatnie w pamięci, starsze w paczkach w pliku tymczasowym."""
+
+    def __init__(self, memory_limit=1000, chunk_size=500):
+        self.memory_limit = memory_limit
+        self.chunk_size = chunk_size
+        self.items = []
+        self.chunks = []  # (pozycja, długość) paczek zapisanych w pliku
+        self.file = None
+
+    def push(self, item):
+        self.items.append(item)
+        if len(self.items) > self.memory_limit:
+            self.spill()
+
+    def spill(self):
+        """Przenosi najstarszą paczkę operacji z pamięci do pliku."""
+        chunk = self.items[:self.chunk_size]
+        del self.items[:self.chunk_size]
+        if self.file is None:
+            self.file = tempfile.TemporaryFile()
+        data = json.dumps([encode(operation) for operation in chunk]).encode("utf-8")
+        position = self.file.seek(0, 2)
+        self.file.write(data)
+        self.chunks.append((position, len(data)))
+
+    def pop(self):
+        if not self.items and self.chunks:
+            position, length = self.chunks.pop()
+            self.file.seek(position)
+            self.items = [decode(item) for item in json.loads(self.file.read(length))]
+            self.file.truncate(position)
+        return self.items.pop() if self.items else None
+
+    def clear(self):
+        self.items = []
+        self.chunks = []
+        if self.file is not None:
+            self.file.truncate(0)
+
+    def __len__(self):
+        return len(self.items) + len(self.chunks) * self.chunk_size
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class EditHistory:
+    def __init__(self, memory_limit=1000, chunk_size=500):
+        self.undo_stack = SpillStack(memory_limit, chunk_size)
+        self.redo_stack = SpillStack(memory_limit, chunk_size)
+
+    def record(self, date, start, old, new):
+        """Zapamiętuje edycję zakresu komórek (bez niezmienionych komórek z brzegów)."""
+        old, new = bytes(old), bytes(new)
+        begin, end = 0, len(old)
+        while begin < end and old[begin] == new[begin]:
+            begin += 1
+        while end > begin and old[end - 1] == new[end - 1]:
+            end -= 1
+        if begin == end:
+            return
+        self.undo_stack.push(EditOperation(date, start + begin, old[begin:end], new[begin:end]))
+        self.redo_stack.clear()
+
+    def undo(self):
+        """Zwraca operację do cofnięcia (zapisz operation.old) lub None."""
+        operation = self.undo_stack.pop()
+        if operation is not None:
+            self.redo_stack.push(operation)
+        return operation
+
+    def redo(self):
+        """Zwraca operację do ponowienia (zapisz operation.new) lub None."""
+        operation = self.redo_stack.pop()
+        if operation is not None:
+            self.undo_stack.push(operation)
+        return operation
+
+    def clear(self):
+        """Dane podmienione (wczytanie, scalenie) - dotychczasowa historia nie pasuje."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def close(self):
+        self.undo_stack.close()
+        self.redo_stack.close()